@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from options import ESCALATION_TYPES, EDD_MEASURES
+
+# Define weights for each escalation type and EDD measure
+weights = {
+    'other_red_flags': 1,
+    'adverse_media': 3,
+    'high_risk': 5,
+    'pep_association': 3,
+    'country_risk': 1,
+    'complex_ownership': 1,
+    'young_company': 1,
+    'medium_risk': 4,
+    'combined_reviews': 2  # Combined weight for document review, aml review, audit review, and feedback review
+}
+
+# Source column and category list of each count block in the report
+COUNT_SOURCES = [
+    ('escalation_type', ESCALATION_TYPES, '_esc'),
+    ('EDD_measures', EDD_MEASURES, '_meas'),
+]
+
+
+def count_columns():
+    """(column name, source column, category, weight) for every count column, in report order.
+
+    A category offered in more than one list gets the block suffix so the names stay unique,
+    e.g. feedback_review_esc / feedback_review_meas. Escalation types without their own weight
+    and all EDD measures are weighted as combined reviews.
+    """
+    seen = {}
+    for source, categories, _ in COUNT_SOURCES:
+        for category in categories:
+            seen[category] = seen.get(category, 0) + 1
+
+    columns = []
+    for source, categories, suffix in COUNT_SOURCES:
+        for category in categories:
+            name = category + suffix if seen[category] > 1 else category
+            weight = weights.get(category, weights['combined_reviews']) if source == 'escalation_type' else weights['combined_reviews']
+            columns.append((name, source, category, weight))
+    return columns
+
+
+COUNT_COLUMNS = count_columns()
+
+
+def _codes(values, categories):
+    # Categorical input over the same categories (see frames.typed_frame) already has the codes
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.categories[:len(categories)].equals(pd.Index(categories)):
+        codes = values.cat.codes.to_numpy()
+        return np.where(codes < len(categories), codes, -1)
+    # Unlisted values and missing ones both get -1
+    return pd.Index(categories).get_indexer(np.asarray(values, dtype=object))
+
+
+def _reviewer_codes(reviewer):
+    # Codes of the observed reviewers only, ordered by name
+    if isinstance(reviewer.dtype, pd.CategoricalDtype):
+        codes = reviewer.cat.codes.to_numpy()
+        observed = np.flatnonzero(np.bincount(codes[codes >= 0], minlength=len(reviewer.cat.categories)))
+        names = reviewer.cat.categories[observed]
+        order = names.argsort()
+        remap = np.full(len(reviewer.cat.categories), -1)
+        remap[observed[order]] = np.arange(len(observed))
+        return np.where(codes >= 0, remap[codes], -1), names[order]
+    return pd.factorize(np.asarray(reviewer, dtype=object), sort=True)
+
+
+def _count_matrix(reviewer_codes, n_reviewers, values, categories, counts=None):
+    # Reviewer x category counts in one bincount over the flattened (reviewer, category) code
+    codes = _codes(values, categories)
+    valid = (codes >= 0) & (reviewer_codes >= 0)
+    flat = reviewer_codes[valid].astype(np.int64) * len(categories) + codes[valid]
+    counts = None if counts is None else np.asarray(counts)[valid]
+    matrix = np.bincount(flat, weights=counts, minlength=n_reviewers * len(categories))
+    return matrix.reshape(n_reviewers, len(categories)).astype(np.int64)
+
+
+def aggregate_by_reviewer(df, count_column=None):
+    """Count every escalation type and EDD measure per reviewer in a single vectorized pass.
+
+    If count_column is given, each row stands for that many entries (pre-aggregated input).
+    """
+    reviewer_codes, reviewers = _reviewer_codes(df['EDD_reviewer'])
+    counts = None if count_column is None else df[count_column].to_numpy()
+
+    blocks = [
+        _count_matrix(reviewer_codes, len(reviewers), df[source], categories, counts)
+        for source, categories, _ in COUNT_SOURCES
+    ]
+    agg_data = pd.DataFrame(np.hstack(blocks), columns=[name for name, *_ in COUNT_COLUMNS])
+    agg_data.insert(0, 'EDD_reviewer', reviewers)
+    return agg_data
+
+
+def aggregate_chunks(chunks, count_column=None):
+    """aggregate_by_reviewer() over a stream of DataFrames, summing the per-chunk count matrices."""
+    total = None
+    for chunk in chunks:
+        part = aggregate_by_reviewer(chunk, count_column).set_index('EDD_reviewer')
+        total = part if total is None else total.add(part, fill_value=0)
+    if total is None:
+        return aggregate_by_reviewer(pd.DataFrame(columns=['EDD_reviewer'] + [source for source, *_ in COUNT_SOURCES]))
+    return total.astype('int64').sort_index().reset_index()
+
+
+def build_sla_table(agg_data, total_working_hours):
+    """Add the Total column and row, Total Working Hours, Total SLA period and Difference.
+
+    total_working_hours is one value for every reviewer or an array aligned with agg_data's rows
+    (see business_calendar.working_hours); the Total row gets their sum.
+    """
+    count_names = [name for name, *_ in COUNT_COLUMNS]
+    column_weights = np.array([weight for *_, weight in COUNT_COLUMNS])
+
+    # Calculate totals for each row and column
+    agg_data['Total'] = agg_data[count_names].sum(axis=1)
+    agg_data['Total Working Hours'] = np.broadcast_to(np.asarray(total_working_hours), len(agg_data))
+    total_row = pd.DataFrame(agg_data.sum(numeric_only=True)).transpose()
+    total_row['EDD_reviewer'] = 'Total'
+    agg_data = pd.concat([agg_data, total_row], ignore_index=True)
+
+    agg_data['Total SLA period'] = agg_data[count_names].to_numpy() @ column_weights
+    agg_data['Difference'] = agg_data['Total Working Hours'] - agg_data['Total SLA period']
+    return agg_data
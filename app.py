@@ -2,7 +2,9 @@ import streamlit as st
 from streamlit_option_menu import option_menu
 
 # Importing all the scripts
-from scripts import input_form, data_download, data_visualization, transformed_data_display, dashboard, report_scheduling
+from scripts import input_form, data_download, data_visualization, transformed_data_display, dashboard, report_scheduling, data_upload
+from scripts import migrations
+import mysql.connector
 
 
 st.set_page_config(
@@ -16,6 +18,12 @@ st.set_page_config(
     }
 )
 
+# Bring the database schema up to date; runs once per process, not on every rerun
+try:
+    migrations.ensure_schema()
+except mysql.connector.Error as err:
+    st.error(f"Error initializing database: {err}")
+
 custom_css = """
 <style>
 /* General styling */
@@ -179,8 +187,8 @@ logo_path = r"C:\AI-ML\campus_x\INTERVIEW_PREP\Onboarding\assets\Terrapay-Logo.p
 with st.sidebar:
     st.image(logo_path, use_column_width=True)
     selected = option_menu(
-        "Main Menu", ["Input Form", "Download Data", "Data Visualization", "Transformed Data", "Dashboard", "Report Scheduling"],
-        icons=['pencil', 'download', 'bar-chart', 'table', 'speedometer', 'calendar'],
+        "Main Menu", ["Input Form", "Bulk Upload", "Download Data", "Data Visualization", "Transformed Data", "Dashboard", "Report Scheduling"],
+        icons=['pencil', 'upload', 'download', 'bar-chart', 'table', 'speedometer', 'calendar'],
         menu_icon="cast", default_index=0,
         styles={
             "container": {"padding": "5!important", "background-color": "#f0f0f0"},  # Light background color
@@ -193,6 +201,8 @@ with st.sidebar:
 # Display the selected page
 if selected == "Input Form":
     input_form.show()
+elif selected == "Bulk Upload":
+    data_upload.show()
 elif selected == "Download Data":
     data_download.show()
 elif selected == "Data Visualization":
@@ -0,0 +1,151 @@
+"""Per-reviewer, per-week SLA reports rendered in parallel.
+
+Every (reviewer, week) job aggregates the reviewer's rows, renders a Plotly chart (HTML) and an
+Excel sheet. Jobs are fanned out to a ProcessPoolExecutor. The dataset is never pickled per
+job: each worker's initializer reads the Parquet snapshot once and keeps it in a module global,
+so a job only carries its reviewer and dates.
+
+Weeks follow the Weekly Data Report tabs: days 1-7, 8-14, 15-21 and 22 to month end.
+
+    BATCH_WORKERS   worker processes (default: CPU count)
+
+    python batch_reports.py --year 2024 [--months 1 2 3] [--workers 8] [--refresh-snapshot]
+"""
+import argparse
+import calendar
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import export
+import snapshot
+import styling
+from aggregation import COUNT_COLUMNS, aggregate_by_reviewer, build_sla_table
+from business_calendar import working_days, working_hours
+from frames import typed_frame
+from options import EDD_REVIEWERS
+from report_engine import REPORTS_DIR
+
+WORKERS = int(os.getenv("BATCH_WORKERS", os.cpu_count() or 1))
+BATCH_DIR = os.path.join(REPORTS_DIR, "batch")
+WEEKS = ["Week 1", "Week 2", "Week 3", "Week 4"]
+
+# Per-worker copy of the dataset: {reviewer: rows sorted by completion_date}
+_rows_by_reviewer = {}
+
+
+def month_weeks(year, month):
+    """(label, start, end) of the four week tabs of a month."""
+    last_day = calendar.monthrange(year, month)[1]
+    bounds = [(1, 7), (8, 14), (15, 21), (22, last_day)]
+    return [(label, date(year, month, first), date(year, month, last)) for label, (first, last) in zip(WEEKS, bounds)]
+
+
+def jobs_for(year, months, reviewers=EDD_REVIEWERS):
+    return [
+        (reviewer, f"{year}-{month:02d}", label, start, end)
+        for month in months
+        for label, start, end in month_weeks(year, month)
+        for reviewer in reviewers
+    ]
+
+
+def _init_worker(snapshot_path):
+    # Runs once per worker process: load the snapshot and index it by reviewer
+    global _rows_by_reviewer
+    df = typed_frame(snapshot.pq.read_table(snapshot_path).to_pandas())
+    df = df.sort_values('completion_date', kind='stable')
+    _rows_by_reviewer = {
+        str(reviewer): rows.reset_index(drop=True)
+        for reviewer, rows in df.groupby('EDD_reviewer', observed=True)
+    }
+
+
+def render_job(job):
+    """Aggregate, chart and export one (reviewer, week); returns its timing and files."""
+    reviewer, month, label, start_date, end_date = job
+    started = time.process_time()
+
+    rows = _rows_by_reviewer.get(reviewer)
+    agg_data = None
+    if rows is not None:
+        # Rows are sorted by date, so the week is one contiguous slice
+        dates = rows['completion_date'].to_numpy()
+        low, high = np.searchsorted(dates, [np.datetime64(start_date), np.datetime64(end_date) + np.timedelta64(1, 'D')])
+        rows = rows.iloc[low:high]
+        rows = rows[rows['completion_date'].isin(working_days(start_date, end_date))]
+        agg_data = aggregate_by_reviewer(rows)
+    if agg_data is None or agg_data.empty:
+        # A reviewer without entries in the week still gets a (zero) report
+        agg_data = pd.DataFrame([[reviewer] + [0] * len(COUNT_COLUMNS)], columns=['EDD_reviewer'] + [name for name, *_ in COUNT_COLUMNS])
+    table = build_sla_table(agg_data, working_hours(agg_data['EDD_reviewer'].to_numpy(), start_date, end_date))
+
+    out_dir = os.path.join(BATCH_DIR, month, label.replace(' ', '_').lower())
+    os.makedirs(out_dir, exist_ok=True)
+    counts = table.iloc[:1].melt(id_vars=['EDD_reviewer'], value_vars=[name for name, *_ in COUNT_COLUMNS], var_name='Category', value_name='Count')
+    fig = px.bar(counts, x='Category', y='Count', title=f"{reviewer}: {label} of {month} ({start_date} to {end_date})")
+    chart_path = os.path.join(out_dir, f"{reviewer}.html")
+    fig.write_html(chart_path, include_plotlyjs='cdn')
+
+    excel_path = os.path.join(out_dir, f"{reviewer}.xlsx")
+    shutil.move(export.write_excel([table], sheet_name='SLA', fill_colors=styling.fill_colors), excel_path)
+
+    return {
+        'reviewer': reviewer,
+        'month': month,
+        'week': label,
+        'entries': int(table['Total'].iloc[-1]),
+        'cpu_seconds': time.process_time() - started,
+        'files': [chart_path, excel_path],
+    }
+
+
+def run(year, months, workers=WORKERS, reviewers=EDD_REVIEWERS):
+    """Render every job and return (results, summary)."""
+    jobs = jobs_for(year, months, reviewers)
+    started_wall = time.perf_counter()
+    started_cpu = time.process_time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(snapshot.SNAPSHOT_PATH,)) as pool:
+        results = list(pool.map(render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    wall = time.perf_counter() - started_wall
+
+    job_cpu = sum(result['cpu_seconds'] for result in results)
+    summary = {
+        'jobs': len(jobs),
+        'workers': workers,
+        'wall_seconds': round(wall, 2),
+        'job_cpu_seconds': round(job_cpu, 2),
+        'parent_cpu_seconds': round(time.process_time() - started_cpu, 2),
+        # How many cores' worth of work ran at once on average
+        'parallelism': round(job_cpu / wall, 2) if wall else 0.0,
+    }
+    return results, summary
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Render per-reviewer weekly SLA reports in parallel.")
+    parser.add_argument("--year", type=int, default=date.today().year)
+    parser.add_argument("--months", type=int, nargs="+", default=list(range(1, 13)))
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--refresh-snapshot", action="store_true", help="rewrite the snapshot from MySQL first")
+    args = parser.parse_args(argv)
+
+    if args.refresh_snapshot or not snapshot.available():
+        snapshot.refresh()
+    results, summary = run(args.year, args.months, args.workers)
+    print(f"Rendered {summary['jobs']} reports into {BATCH_DIR}")
+    print(
+        f"wall {summary['wall_seconds']}s, job CPU {summary['job_cpu_seconds']}s, "
+        f"parent CPU {summary['parent_cpu_seconds']}s, {summary['workers']} workers, "
+        f"parallelism {summary['parallelism']}x"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
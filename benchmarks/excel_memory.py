@@ -0,0 +1,70 @@
+"""Peak RSS of the Excel export against row count.
+
+Each (writer, row count) pair runs in a fresh interpreter so ru_maxrss measures that export
+alone. "pandas" is the old full-DataFrame pd.ExcelWriter path, "streaming" is
+export.write_excel fed by chunks.
+
+    python -m benchmarks.excel_memory [--rows 10000 50000 200000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from io import BytesIO
+import pandas as pd
+import export
+from benchmarks.generate import onboarding_chunks
+from benchmarks.suite import peak_rss_mb
+
+CHUNK_SIZE = 10000
+WRITERS = ['pandas', 'streaming']
+
+
+def run_one(writer, rows):
+    started = time.perf_counter()
+    if writer == 'pandas':
+        df = pd.concat(onboarding_chunks(rows, CHUNK_SIZE), ignore_index=True)
+        output = BytesIO()
+        with pd.ExcelWriter(output, engine='xlsxwriter') as excel_writer:
+            df.to_excel(excel_writer, index=False, sheet_name='Sheet1')
+        size = len(output.getvalue())
+    else:
+        path = export.write_excel(onboarding_chunks(rows, CHUNK_SIZE))
+        size = os.path.getsize(path)
+        os.remove(path)
+    return {
+        'writer': writer,
+        'rows': rows,
+        'seconds': round(time.perf_counter() - started, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'file_mb': round(size / (1024 * 1024), 2),
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark peak RSS of the Excel export against row count.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 50000, 200000])
+    parser.add_argument("--child", nargs=2, metavar=("WRITER", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_one(args.child[0], int(args.child[1]))))
+        return 0
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"{'writer':<10} {'rows':>10} {'seconds':>9} {'peak RSS MB':>12} {'file MB':>8}")
+    for rows in args.rows:
+        for writer in WRITERS:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.excel_memory", "--child", writer, str(rows)],
+                cwd=root, capture_output=True, text=True, check=True,
+            )
+            result = json.loads(out.stdout)
+            print(f"{writer:<10} {rows:>10} {result['seconds']:>9} {result['peak_rss_mb']:>12} {result['file_mb']:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,132 @@
+"""Seeded generator of realistic onboarding rows.
+
+Rows use the Input Form option lists with a skewed mix (some reviewers, deal types and
+escalations are far more common than others), a few missing escalation types and measures, and
+partners drawn from a long tail. Completion dates are spread over the period the way entries
+arrive: mostly on weekdays, growing over time, with a quarter-end rush. Rows come out in
+completion-date order, as the table fills up, so every chunk covers a contiguous date range.
+
+The same (rows, seed) always produces the same rows.
+
+    python -m benchmarks.generate --scale 1m [--seed 0] [--csv onboarding.csv]
+
+writes the dataset used by the benchmark suite (a Parquet file under data/bench/), or a CSV
+that bulk_import.py can load into a scratch MySQL database.
+"""
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+import export
+import snapshot
+from options import DEAL_TYPES, REVIEW_TYPES, ESCALATION_TYPES, EDD_REVIEWERS, EDD_MEASURES
+
+SCALES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+CHUNK_SIZE = 100_000
+START_DATE = '2023-01-01'
+END_DATE = '2024-12-31'
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "bench")
+
+PARTNERS = 5000
+WEEKEND_SHARE = 0.03   # Weekend days get this fraction of a weekday's entries
+GROWTH = 0.5           # The last day gets this much more than the first
+QUARTER_END_RUSH = 1.4
+MISSING_RATE = 0.04    # escalation_type / EDD_measures left empty
+
+
+def _weights(n, decay):
+    weights = decay ** np.arange(n, dtype=np.float64)
+    return weights / weights.sum()
+
+
+# Option mixes: the first listed value is the most common
+MIX = {
+    'deal_type': (DEAL_TYPES, _weights(len(DEAL_TYPES), 0.6)),
+    'review_type': (REVIEW_TYPES, np.array([0.65, 0.35])),
+    'escalation_type': (ESCALATION_TYPES, _weights(len(ESCALATION_TYPES), 0.8)),
+    'EDD_reviewer': (EDD_REVIEWERS, _weights(len(EDD_REVIEWERS), 0.85)),
+    'EDD_measures': (EDD_MEASURES, _weights(len(EDD_MEASURES), 0.6)),
+}
+
+
+def day_weights(start_date=START_DATE, end_date=END_DATE):
+    """(days, share of entries per day) over the period."""
+    days = pd.date_range(start_date, end_date, freq='D')
+    weights = np.where(days.dayofweek < 5, 1.0, WEEKEND_SHARE)
+    weights = weights * (1 + GROWTH * np.linspace(0, 1, len(days)))
+    # The last week of every quarter
+    quarter_end = (days + pd.Timedelta(days=7)).quarter != days.quarter
+    weights = weights * np.where(quarter_end, QUARTER_END_RUSH, 1.0)
+    return days.values.astype('datetime64[D]'), weights / weights.sum()
+
+
+def onboarding_chunks(rows, chunk_size=CHUNK_SIZE, seed=0, start_date=START_DATE, end_date=END_DATE):
+    """Onboarding-shaped DataFrames of at most chunk_size rows, in completion-date order."""
+    rng = np.random.default_rng(seed)
+    days, weights = day_weights(start_date, end_date)
+    # Entries per day are fixed up front, so the chunks can walk the days in order
+    day_ends = np.cumsum(rng.multinomial(rows, weights))
+    partner_weights = 1 / np.arange(1, PARTNERS + 1) ** 1.1
+    partner_weights /= partner_weights.sum()
+
+    for first in range(0, rows, chunk_size):
+        n = min(chunk_size, rows - first)
+        completion_date = days[np.searchsorted(day_ends, np.arange(first, first + n), side='right')]
+        # Logged during office hours, mostly in the afternoon
+        seconds = np.clip(rng.normal(14.5 * 3600, 2.5 * 3600, n), 9 * 3600, 20 * 3600 - 1).astype('timedelta64[s]')
+        ids = rng.integers(0, 2**63, (n, 2), dtype=np.int64)
+
+        chunk = {
+            'id': np.char.add(np.char.mod('%016x', ids[:, 0]), np.char.mod('%016x', ids[:, 1])).astype(object),
+            'completion_date': pd.to_datetime(completion_date),
+            'partner_name': np.char.mod('Partner %04d', rng.choice(PARTNERS, n, p=partner_weights)).astype(object),
+        }
+        for col, (values, p) in MIX.items():
+            chunk[col] = np.asarray(values, dtype=object)[rng.choice(len(values), n, p=p)]
+            if col in ('escalation_type', 'EDD_measures'):
+                chunk[col][rng.random(n) < MISSING_RATE] = None
+        chunk['timestamp'] = pd.to_datetime(completion_date.astype('datetime64[s]') + seconds)
+        yield pd.DataFrame(chunk)
+
+
+def dataset_path(rows, seed=0):
+    return os.path.join(DATASET_DIR, f"onboarding_{rows}_{seed}.parquet")
+
+
+def ensure_dataset(rows, seed=0, progress=None):
+    """Path of the (rows, seed) dataset as a Parquet snapshot file, generating it when missing."""
+    path = dataset_path(rows, seed)
+    if not os.path.exists(path):
+        os.makedirs(DATASET_DIR, exist_ok=True)
+        tmp_path = export.write_parquet(onboarding_chunks(rows, seed=seed), schema=snapshot.ONBOARDING_SCHEMA, progress=progress)
+        os.replace(tmp_path, path)
+    return path
+
+
+def write_csv(rows, path, seed=0):
+    """The dataset as a CSV with ISO dates, for bulk_import.py."""
+    for i, chunk in enumerate(onboarding_chunks(rows, seed=seed)):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Generate a seeded onboarding dataset.")
+    parser.add_argument("--scale", choices=SCALES, default='10k')
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", help="write a CSV for bulk_import.py instead of the Parquet dataset")
+    args = parser.parse_args(argv)
+
+    rows = SCALES[args.scale]
+    if args.csv:
+        write_csv(rows, args.csv, args.seed)
+        print(f"Wrote {rows} rows to {args.csv}")
+    else:
+        path = ensure_dataset(rows, args.seed, progress=lambda written: print(f"\r{written} rows", end="", flush=True))
+        print()
+        print(f"Dataset of {rows} rows at {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
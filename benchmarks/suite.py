@@ -0,0 +1,264 @@
+"""Benchmarks of the report fetches, aggregations and exports at 10k / 1M / 10M rows.
+
+Every (case, scale) runs in a fresh interpreter, so the peak RSS is that case's alone. Input
+data comes from benchmarks.generate: the seeded dataset is a Parquet snapshot file, which the
+snapshot-backed cases read through SNAPSHOT_PATH and the export cases stream in chunks.
+
+Cases marked "mysql" run the pages' MySQL paths against the configured database (MYSQL_* as for
+the app). They only run with --mysql; point MYSQL_DATABASE at a scratch database loaded with
+the same dataset first:
+
+    python -m benchmarks.generate --scale 1m --csv /tmp/onboarding.csv
+    python bulk_import.py /tmp/onboarding.csv && python rollup.py backfill
+
+Results (seconds, peak RSS) are saved as benchmarks/results/<commit>.json; compare two runs
+with --compare.
+
+    python -m benchmarks.suite [--scale 10k 1m] [--case export_csv ...] [--mysql]
+    python -m benchmarks.suite --compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+import pandas as pd
+from benchmarks import generate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+CHUNK_SIZE = 10000
+# An .xlsx sheet holds at most 1,048,576 rows including the header
+EXCEL_MAX_ROWS = 1_048_575
+
+# Case name -> whether it needs MySQL
+CASES = {
+    'fetch_data': True,
+    'fetch_aggregates': True,
+    'fetch_transformed_data': True,
+    'fetch_transformed_data_snapshot': False,
+    'aggregate_by_reviewer': False,
+    'export_csv': False,
+    'export_csv_gzip': False,
+    'export_excel': False,
+}
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def rss_mb():
+    """Current RSS, from /proc where available (else the peak so far)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except OSError:
+        return peak_rss_mb()
+
+
+def dataset_chunks(path, limit=None):
+    """The dataset as DataFrame chunks of CHUNK_SIZE rows, like db.iter_chunks() yields them."""
+    import snapshot
+
+    parquet_file = snapshot.pq.ParquetFile(path)
+    rows = 0
+    for batch in parquet_file.iter_batches(batch_size=CHUNK_SIZE):
+        if limit is not None and rows + batch.num_rows > limit:
+            batch = batch.slice(0, limit - rows)
+        yield batch.to_pandas()
+        rows += batch.num_rows
+        if limit is not None and rows >= limit:
+            return
+
+
+def _period():
+    return pd.Timestamp(generate.START_DATE).date(), pd.Timestamp(generate.END_DATE).date()
+
+
+def _last_month():
+    end = pd.Timestamp(generate.END_DATE)
+    return end.replace(day=1).date(), end.date()
+
+
+def setup(case, path):
+    """Inputs loaded before the clock starts; returns the callable to measure."""
+    if CASES[case]:
+        import db
+        # The pages turn MySQL errors into st.error; fail here instead of timing an empty result
+        with db.connection():
+            pass
+    if case == 'fetch_data':
+        import data_download
+        return lambda: {'output_rows': len(data_download.fetch_data())}
+    if case == 'fetch_aggregates':
+        import data_download
+        return lambda: {'output_rows': sum(len(df) for df in data_download.fetch_aggregates())}
+    if case in ('fetch_transformed_data', 'fetch_transformed_data_snapshot'):
+        import transformed_data_display
+        # The MySQL path reads the daily rollup of the last month; the snapshot path every row
+        start_date, end_date = _last_month() if case == 'fetch_transformed_data' else _period()
+        use_snapshot = case == 'fetch_transformed_data_snapshot'
+        return lambda: {'output_rows': len(transformed_data_display.fetch_transformed_data(start_date, end_date, use_snapshot=use_snapshot))}
+    if case == 'aggregate_by_reviewer':
+        import snapshot
+        from aggregation import aggregate_by_reviewer, build_sla_table
+        from business_calendar import working_hours
+        start_date, end_date = _period()
+        df = snapshot.load_period(start_date, end_date)
+
+        def run():
+            agg_data = aggregate_by_reviewer(df)
+            table = build_sla_table(agg_data, working_hours(agg_data['EDD_reviewer'].to_numpy(), start_date, end_date))
+            return {'output_rows': len(table)}
+        return run
+    if case in ('export_csv', 'export_csv_gzip'):
+        import export
+
+        def run():
+            output = export.write_csv(dataset_chunks(path), compress=case == 'export_csv_gzip')
+            size = os.path.getsize(output)
+            os.remove(output)
+            return {'file_mb': round(size / (1024 * 1024), 2)}
+        return run
+    if case == 'export_excel':
+        import export
+
+        def run():
+            # Larger datasets are cut at the sheet limit; output_rows records how many were written
+            written = []
+            output = export.write_excel(dataset_chunks(path, EXCEL_MAX_ROWS), progress=written.append)
+            size = os.path.getsize(output)
+            os.remove(output)
+            return {'output_rows': written[-1] if written else 0, 'file_mb': round(size / (1024 * 1024), 2)}
+        return run
+    raise ValueError(f"unknown case {case}")
+
+
+def run_case(case, path):
+    """Measure one case in this process."""
+    measure = setup(case, path)
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    started_cpu = time.process_time()
+    extra = measure()
+    result = {
+        'seconds': round(time.perf_counter() - started, 3),
+        'cpu_seconds': round(time.process_time() - started_cpu, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        # Peak above what the process held once the inputs were loaded
+        'peak_rss_delta_mb': round(max(peak_rss_mb() - rss_before, 0), 1),
+    }
+    result.update(extra)
+    return result
+
+
+def run_child(case, rows, seed):
+    path = generate.dataset_path(rows, seed)
+    env = dict(os.environ, SNAPSHOT_PATH=path, STREAMLIT_LOGGER_LEVEL='error')
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--child", case, str(rows), str(seed)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if out.returncode != 0:
+        return {'error': (out.stderr.strip().splitlines() or ['failed'])[-1]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def save_results(results, seed):
+    """Merge results into benchmarks/results/<commit>.json; returns its path."""
+    commit, dirty = git_commit()
+    path = os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+    report = {'results': []}
+    if os.path.exists(path):
+        with open(path) as f:
+            report = json.load(f)
+    # A rerun of a case at a scale replaces its earlier result
+    keys = {(result['case'], result['rows']) for result in results}
+    report['results'] = [result for result in report['results'] if (result['case'], result['rows']) not in keys] + results
+    report.update({
+        'commit': commit,
+        'dirty': dirty,
+        'seed': seed,
+        'run_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    })
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def compare(base_path, head_path):
+    """Print the seconds and peak RSS of two result files side by side."""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+    before = {(r['case'], r['rows']): r for r in base['results']}
+    print(f"{'case':<34} {'rows':>10} {base['commit'] + ' s':>12} {head['commit'] + ' s':>12} {'ratio':>7} {'peak MB':>16}")
+    for result in head['results']:
+        old = before.get((result['case'], result['rows']))
+        if old is None or 'seconds' not in old or 'seconds' not in result:
+            continue
+        ratio = result['seconds'] / old['seconds'] if old['seconds'] else float('nan')
+        memory = f"{old['peak_rss_mb']} -> {result['peak_rss_mb']}"
+        print(f"{result['case']:<34} {result['rows']:>10} {old['seconds']:>12} {result['seconds']:>12} {ratio:>6.2f}x {memory:>16}")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the report fetches, aggregations and exports.")
+    parser.add_argument("--scale", nargs="+", choices=generate.SCALES, default=['10k', '1m'])
+    parser.add_argument("--case", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mysql", action="store_true", help="also run the cases that query the configured MySQL database")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="compare two result files and exit")
+    parser.add_argument("--child", nargs=3, metavar=("CASE", "ROWS", "SEED"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        case, rows, seed = args.child
+        print(json.dumps(run_case(case, generate.dataset_path(int(rows), int(seed)))))
+        return 0
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    results = []
+    print(f"{'case':<34} {'rows':>10} {'seconds':>9} {'peak RSS MB':>12} {'delta MB':>9}")
+    for scale in args.scale:
+        rows = generate.SCALES[scale]
+        generate.ensure_dataset(rows, args.seed)
+        for case in args.case:
+            if CASES[case] and not args.mysql:
+                continue
+            result = {'case': case, 'rows': rows}
+            result.update(run_child(case, rows, args.seed))
+            results.append(result)
+            if 'error' in result:
+                print(f"{case:<34} {rows:>10} failed: {result['error']}")
+            else:
+                print(f"{case:<34} {rows:>10} {result['seconds']:>9} {result['peak_rss_mb']:>12} {result['peak_rss_delta_mb']:>9}")
+    print(f"Results saved to {save_results(results, args.seed)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
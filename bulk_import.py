@@ -0,0 +1,154 @@
+"""Bulk import of onboarding records from CSV or Excel files.
+
+The file is parsed in chunks; day-first dates such as 01-01-2023 and timestamps such as
+01-01-2023 10:00 are normalized, and each chunk is loaded with one batched executemany in its
+own transaction together with the matching daily rollup rows. Rows whose id already exists are
+skipped, so an import can be re-run safely. Rows whose completion_date can't be parsed are
+imported without one and counted in the summary, since every date-based report leaves them out.
+
+    python bulk_import.py main.csv [--chunk-size 5000]
+"""
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime
+import pandas as pd
+import db
+import rollup
+
+COLUMNS = ['id', 'completion_date', 'partner_name', 'deal_type', 'review_type', 'escalation_type', 'EDD_reviewer', 'EDD_measures', 'timestamp']
+CHUNK_SIZE = 5000
+# Unparseable completion_date values quoted in the summary
+MAX_EXAMPLES = 5
+
+# Tried in order before falling back to pandas' per-value parser
+DATE_FORMATS = ['%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%d.%m.%Y']
+TIMESTAMP_FORMATS = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%d-%m-%Y %H:%M', '%d-%m-%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S']
+
+BULK_INSERT_QUERY = '''
+    INSERT INTO onboarding (id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE id = id
+'''
+
+
+def read_chunks(source, filename=None, chunk_size=CHUNK_SIZE):
+    """Yield the file as DataFrames of at most chunk_size rows, every value read as text."""
+    name = (filename or str(source)).lower()
+    if name.endswith(('.xlsx', '.xls')):
+        # Excel readers can't stream; slice the sheet so loading still happens in batches
+        df = pd.read_excel(source, dtype=str)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    else:
+        yield from pd.read_csv(source, dtype=str, chunksize=chunk_size)
+
+
+def parse_dates(values, formats):
+    """Vectorized day-first parsing: each explicit format fills what the previous ones left as NaT."""
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    for fmt in formats:
+        missing = parsed.isna() & values.notna()
+        if not missing.any():
+            return parsed
+        parsed[missing] = pd.to_datetime(values[missing], format=fmt, errors='coerce')
+    missing = parsed.isna() & values.notna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(values[missing], dayfirst=True, format='mixed', errors='coerce')
+    return parsed
+
+
+def normalize_chunk(chunk):
+    """Turn a raw chunk into insert-ready tuples in COLUMNS order.
+
+    Returns the tuples and the non-empty completion_date values that couldn't be parsed.
+    """
+    df = chunk.reindex(columns=COLUMNS).astype('string')
+    df = df.apply(lambda col: col.str.strip().replace('', pd.NA))
+
+    # Rows without an id get one, the same way the Input Form does
+    missing_id = df['id'].isna()
+    df.loc[missing_id, 'id'] = [str(uuid.uuid4()) for _ in range(missing_id.sum())]
+
+    completion_date = parse_dates(df['completion_date'], DATE_FORMATS)
+    unparseable = df['completion_date'][completion_date.isna() & df['completion_date'].notna()]
+    timestamp = parse_dates(df['timestamp'], TIMESTAMP_FORMATS).fillna(pd.Timestamp(datetime.now().replace(microsecond=0)))
+
+    text = df.drop(columns=['completion_date', 'timestamp']).astype(object).where(df.notna(), None)
+    columns = {col: text[col].tolist() for col in text.columns}
+    columns['completion_date'] = [None if pd.isna(value) else value.date() for value in completion_date]
+    columns['timestamp'] = [value.to_pydatetime() for value in timestamp]
+    return list(zip(*(columns[col] for col in COLUMNS))), unparseable.tolist()
+
+
+def import_file(source, filename=None, chunk_size=CHUNK_SIZE, progress=None):
+    """Load a CSV/Excel file into onboarding in batched transactions.
+
+    progress(rows_read, rows_per_second) is called after every chunk. Returns the totals,
+    including the number of rows imported without a date and a few of their original values.
+    """
+    started = time.perf_counter()
+    rows_read = 0
+    rows_inserted = 0
+    unparseable_dates = 0
+    examples = []
+    for chunk in read_chunks(source, filename, chunk_size):
+        rows, unparseable = normalize_chunk(chunk)
+        unparseable_dates += len(unparseable)
+        examples.extend(value for value in unparseable if value not in examples and len(examples) < MAX_EXAMPLES)
+        with db.transaction() as conn:
+            c = conn.cursor()
+            # executemany sends the whole chunk as one multi-row INSERT
+            c.executemany(BULK_INSERT_QUERY, rows)
+            rows_inserted += c.rowcount
+            rollup.refresh_dates(c, [row[1] for row in rows if row[1] is not None])
+            c.close()
+        rows_read += len(rows)
+        if progress:
+            progress(rows_read, rows_read / (time.perf_counter() - started))
+
+    seconds = time.perf_counter() - started
+    return {
+        'rows_read': rows_read,
+        'rows_inserted': rows_inserted,
+        'seconds': seconds,
+        'rows_per_second': rows_read / seconds if seconds else 0.0,
+        'unparseable_dates': unparseable_dates,
+        'unparseable_examples': examples,
+    }
+
+
+def unparseable_warning(result):
+    """Summary line of the rows imported without a completion_date, or None."""
+    if not result['unparseable_dates']:
+        return None
+    return (
+        f"{result['unparseable_dates']} rows had a completion_date that could not be parsed "
+        f"(e.g. {', '.join(repr(value) for value in result['unparseable_examples'])}); they were imported "
+        f"without a date and are left out of the reports"
+    )
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Bulk import onboarding records from a CSV or Excel file.")
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    result = import_file(
+        args.path,
+        chunk_size=args.chunk_size,
+        progress=lambda rows, rate: print(f"\r{rows} rows ({rate:,.0f} rows/s)", end="", flush=True)
+    )
+    print()
+    print(f"Imported {result['rows_inserted']} new of {result['rows_read']} rows in {result['seconds']:.2f}s "
+          f"({result['rows_per_second']:,.0f} rows/s)")
+    warning = unparseable_warning(result)
+    if warning:
+        print(f"Warning: {warning}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
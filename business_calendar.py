@@ -0,0 +1,118 @@
+"""Working days and working hours on numpy business-day calendars.
+
+Holidays are configured per region and leave per reviewer in an optional JSON file:
+
+    {
+        "hours_per_day": 8,
+        "weekmask": "1111100",
+        "default_region": "IN",
+        "holidays": {"IN": ["2024-01-26", "2024-08-15"], "AE": ["2024-12-02"]},
+        "reviewer_regions": {"moustapha": "AE"},
+        "leave": {"hityshi": ["2024-03-04", "2024-03-05"]}
+    }
+
+    BUSINESS_CALENDAR   path of the file (default ./business_calendar.json; without it every
+                        weekday is a working day and nobody is on leave)
+
+Holidays and leave only reduce working hours. Which entries are counted is still decided by the
+report's own skipped dates.
+"""
+import json
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+CALENDAR_PATH = os.getenv("BUSINESS_CALENDAR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "business_calendar.json"))
+HOURS_PER_DAY = 8
+WEEKMASK = '1111100'
+
+
+@lru_cache(maxsize=1)
+def config():
+    try:
+        with open(CALENDAR_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _days(dates):
+    return np.asarray(pd.DatetimeIndex(np.ravel(dates)).values.astype('datetime64[D]')).reshape(np.shape(dates))
+
+
+def weekmask():
+    """The configured working weekdays as seven booleans, Monday first.
+
+    The one place the weekmask is read; the SQL date filter (queries.date_filter) uses it too.
+    """
+    return tuple(bool(day) for day in np.busdaycalendar(weekmask=config().get('weekmask', WEEKMASK)).weekmask)
+
+
+@lru_cache(maxsize=64)
+def busday_calendar(region=None, skipped_dates=()):
+    """numpy calendar of the region's holidays plus the skipped dates (a tuple, for caching)."""
+    settings = config()
+    region = region or settings.get('default_region')
+    holidays = settings.get('holidays', {}).get(region, []) if region else []
+    return np.busdaycalendar(
+        weekmask=weekmask(),
+        holidays=_days(list(holidays) + list(skipped_dates)),
+    )
+
+
+def working_days(start_date, end_date, skipped_dates=()):
+    """Working weekdays between start_date and end_date (inclusive), minus the skipped dates.
+
+    These are the days whose entries a report counts, matching queries.date_filter().
+    """
+    calendar = np.busdaycalendar(weekmask=weekmask(), holidays=_days(list(skipped_dates)))
+    days = np.arange(_days(start_date), _days(end_date) + 1)
+    return pd.DatetimeIndex(days[np.is_busday(days, busdaycal=calendar)])
+
+
+def working_hours(reviewers, start_dates, end_dates, skipped_dates=()):
+    """Working hours of every reviewer x period combination in one vectorized pass.
+
+    reviewers, start_dates and end_dates broadcast against each other, so one period can be
+    evaluated for many reviewers or one reviewer for many periods. A reviewer of None only gets
+    the default region's holidays and no leave.
+    """
+    settings = config()
+    reviewers, starts, ends = np.broadcast_arrays(np.asarray(reviewers, dtype=object), _days(start_dates), _days(end_dates))
+    shape = reviewers.shape
+    reviewers, starts, ends = reviewers.ravel(), starts.ravel(), ends.ravel()
+    skipped = tuple(_days(list(skipped_dates)))
+
+    region_of = settings.get('reviewer_regions', {})
+    regions = np.array([region_of.get(reviewer) for reviewer in reviewers], dtype=object)
+    days = np.zeros(len(reviewers), dtype=np.int64)
+    leave = np.zeros(len(reviewers), dtype=np.int64)
+
+    # One busday_count per region; regions are few, combinations are many
+    leave_by_reviewer = settings.get('leave', {})
+    for region in set(regions):
+        in_region = regions == region
+        calendar = busday_calendar(region, skipped)
+        days[in_region] = np.maximum(np.busday_count(starts[in_region], ends[in_region] + 1, busdaycal=calendar), 0)
+
+        # Leave days that would otherwise be working days, counted per combination with a
+        # searchsorted over (reviewer, day) keys
+        names = sorted({reviewer for reviewer in reviewers[in_region] if reviewer in leave_by_reviewer})
+        if not names:
+            continue
+        code_of = {name: code for code, name in enumerate(names)}
+        keys = []
+        for name in names:
+            leave_days = np.unique(_days(leave_by_reviewer[name]))
+            leave_days = leave_days[np.is_busday(leave_days, busdaycal=calendar)]
+            keys.append(code_of[name] * 2**32 + leave_days.astype(np.int64))
+        keys = np.concatenate(keys)
+
+        combos = np.flatnonzero(in_region & np.array([reviewer in code_of for reviewer in reviewers]))
+        codes = np.array([code_of[reviewer] for reviewer in reviewers[combos]], dtype=np.int64)
+        low = codes * 2**32 + starts[combos].astype(np.int64)
+        high = codes * 2**32 + ends[combos].astype(np.int64)
+        leave[combos] = np.searchsorted(keys, high, side='right') - np.searchsorted(keys, low, side='left')
+
+    return ((days - leave) * settings.get('hours_per_day', HOURS_PER_DAY)).reshape(shape)
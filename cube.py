@@ -0,0 +1,231 @@
+"""Precomputed entry counts behind the Dashboard page.
+
+The cube is one uint32 array over month x deal_type x review_type x escalation_type x
+EDD_reviewer x EDD_measures. Each option-list axis has the fixed Input Form values plus a last
+'(other)' slot for missing or unlisted values, so any combination of sidebar filters resolves by
+indexing and summing the array instead of rescanning rows.
+
+The cube is saved with the table watermark it covers. A refresh only reads the rows whose
+timestamp is past that watermark; when the row count no longer adds up (deletes, or rows inserted
+with older timestamps) it is rebuilt from scratch.
+
+    CUBE_PATH   cube file (default ./data/onboarding_cube.npz)
+
+    python cube.py refresh | rebuild
+"""
+import json
+import os
+import sys
+import threading
+import numpy as np
+import pandas as pd
+import db
+import result_cache
+from frames import CATEGORY_COLUMNS, typed_frame
+
+CUBE_PATH = os.getenv("CUBE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "onboarding_cube.npz"))
+
+# Dimensions after the month axis, in array order
+DIMENSIONS = ['deal_type', 'review_type', 'escalation_type', 'EDD_reviewer', 'EDD_measures']
+OTHER = '(other)'
+
+CUBE_COLUMNS = "completion_date, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp"
+
+
+def labels(dimension):
+    return list(CATEGORY_COLUMNS[dimension]) + [OTHER]
+
+
+def _month_ordinals(dates):
+    # Months since year 0, so consecutive months are consecutive integers
+    dates = pd.DatetimeIndex(dates)
+    return dates.year.to_numpy() * 12 + dates.month.to_numpy() - 1
+
+
+class Cube:
+    """Counts over months first_month .. first_month + len(counts) - 1 and the DIMENSIONS."""
+
+    def __init__(self, counts=None, first_month=None, watermark=(None, 0), rows=0):
+        shape = (0,) + tuple(len(labels(dim)) for dim in DIMENSIONS)
+        self.counts = counts if counts is not None else np.zeros(shape, dtype=np.uint32)
+        self.first_month = first_month
+        self.watermark = watermark
+        # Rows read so far, including those without a completion date; compared with COUNT(*)
+        self.rows = rows
+
+    @property
+    def months(self):
+        if self.first_month is None:
+            return pd.PeriodIndex([], freq='M')
+        ordinals = np.arange(self.first_month, self.first_month + len(self.counts))
+        return pd.PeriodIndex([pd.Period(year=o // 12, month=o % 12 + 1, freq='M') for o in ordinals])
+
+    def _cover(self, low, high):
+        # Grow the month axis (with zero slices) so it spans ordinals low..high
+        if self.first_month is None:
+            self.first_month = low
+            self.counts = np.zeros((high - low + 1,) + self.counts.shape[1:], dtype=np.uint32)
+            return
+        last_month = self.first_month + len(self.counts) - 1
+        before, after = max(self.first_month - low, 0), max(high - last_month, 0)
+        if before or after:
+            self.counts = np.pad(self.counts, [(before, after)] + [(0, 0)] * len(DIMENSIONS))
+            self.first_month -= before
+
+    def add(self, df):
+        """Count the onboarding rows of df (a chunk with the CUBE_COLUMNS)."""
+        self.rows += len(df)
+        df = typed_frame(df)
+        df = df[df['completion_date'].notna()]
+        if df.empty:
+            return
+        months = _month_ordinals(df['completion_date'])
+        self._cover(months.min(), months.max())
+
+        index = [months - self.first_month]
+        for dim in DIMENSIONS:
+            # Missing values (-1) and values past the fixed list land in the '(other)' slot
+            fixed = len(CATEGORY_COLUMNS[dim])
+            codes = df[dim].cat.codes.to_numpy()
+            index.append(np.where((codes < 0) | (codes >= fixed), fixed, codes))
+        flat = np.ravel_multi_index(index, self.counts.shape)
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape).astype(np.uint32)
+
+    def select(self, filters=None, start_month=None, end_month=None):
+        """The counts restricted to the filtered values (a sub-cube with the same axes).
+
+        filters maps a dimension to the labels to keep; a missing or empty selection keeps all.
+        start_month and end_month are inclusive pd.Period months.
+        """
+        counts = self.counts
+        if self.first_month is not None and (start_month is not None or end_month is not None):
+            low = 0 if start_month is None else max(start_month.year * 12 + start_month.month - 1 - self.first_month, 0)
+            high = len(counts) if end_month is None else max(end_month.year * 12 + end_month.month - self.first_month, 0)
+            counts = counts[low:high]
+        for axis, dim in enumerate(DIMENSIONS, start=1):
+            selected = (filters or {}).get(dim)
+            if selected:
+                positions = [labels(dim).index(value) for value in selected]
+                counts = np.take(counts, positions, axis=axis)
+        return counts
+
+    def totals(self, by, filters=None, start_month=None, end_month=None):
+        """Filtered counts summed onto the `by` dimensions (or 'month'), as a Series."""
+        by = [by] if isinstance(by, str) else list(by)
+        counts = self.select(filters, start_month, end_month)
+        axes = ['month'] + DIMENSIONS
+        keep = [axes.index(name) for name in by]
+        summed = counts.sum(axis=tuple(i for i in range(counts.ndim) if i not in keep), dtype=np.int64)
+        # The kept axes are still in cube order; put them in the order of `by`
+        summed = summed.transpose(np.argsort(np.argsort(keep)))
+
+        levels = []
+        for name in by:
+            if name == 'month':
+                months = self.months
+                if start_month is not None:
+                    months = months[months >= start_month]
+                if end_month is not None:
+                    months = months[months <= end_month]
+                levels.append(months.astype(str))
+            else:
+                selected = (filters or {}).get(name)
+                levels.append(list(selected) if selected else labels(name))
+        if len(by) == 1:
+            return pd.Series(summed, index=pd.Index(levels[0], name=by[0]), name='entries')
+        return pd.Series(summed.ravel(), index=pd.MultiIndex.from_product(levels, names=by), name='entries')
+
+    def save(self, path=CUBE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # np.savez appends .npz unless the name already ends with it
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            counts=self.counts,
+            first_month=np.int64(-1 if self.first_month is None else self.first_month),
+            rows=np.int64(self.rows),
+            watermark=json.dumps([None if self.watermark[0] is None else str(self.watermark[0]), self.watermark[1]]),
+            dimensions=json.dumps([labels(dim) for dim in DIMENSIONS]),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CUBE_PATH):
+        """The saved cube, or None when there is none or the option lists changed since."""
+        try:
+            with np.load(path) as data:
+                if json.loads(str(data['dimensions'])) != [labels(dim) for dim in DIMENSIONS]:
+                    return None
+                first_month = int(data['first_month'])
+                max_timestamp, row_count = json.loads(str(data['watermark']))
+                return cls(
+                    counts=data['counts'],
+                    first_month=None if first_month < 0 else first_month,
+                    watermark=(None if max_timestamp is None else pd.Timestamp(max_timestamp).to_pydatetime(), row_count),
+                    rows=int(data['rows']),
+                )
+        except FileNotFoundError:
+            return None
+
+
+_lock = threading.Lock()
+_current = None
+
+
+def _read(conn, cube, where="", params=()):
+    for chunk in db.iter_chunks(conn, f"SELECT {CUBE_COLUMNS} FROM onboarding {where}", params):
+        cube.add(chunk)
+
+
+def rebuild(conn):
+    """A new cube of every onboarding row."""
+    watermark = result_cache.watermark(conn)
+    cube = Cube(watermark=watermark)
+    _read(conn, cube)
+    return cube
+
+
+def refresh(conn, cube):
+    """Bring cube up to the current watermark, reading only the newer rows when possible."""
+    watermark = result_cache.watermark(conn)
+    if cube is None or cube.watermark[0] is None:
+        return rebuild(conn)
+    if tuple(watermark) == tuple(cube.watermark):
+        return cube
+    # Count into a copy so a rerun still holding the old cube never sees a half-applied refresh
+    cube = Cube(cube.counts.copy(), cube.first_month, cube.watermark, cube.rows)
+    _read(conn, cube, "WHERE timestamp > %s", (cube.watermark[0],))
+    cube.watermark = watermark
+    if cube.rows != watermark[1]:
+        # Rows were deleted or arrived with older timestamps; incremental counts can't be trusted
+        return rebuild(conn)
+    return cube
+
+
+def current():
+    """The up-to-date cube, kept in memory and saved to CUBE_PATH whenever it changes."""
+    global _current
+    with _lock:
+        cube = _current if _current is not None else Cube.load()
+        before = None if cube is None else (cube.watermark, cube.rows)
+        with db.connection() as conn:
+            cube = refresh(conn, cube)
+        if (cube.watermark, cube.rows) != before:
+            cube.save()
+        _current = cube
+        return cube
+
+
+def main(argv):
+    if argv not in (["refresh"], ["rebuild"]):
+        print("usage: python cube.py refresh | rebuild")
+        return 2
+    with db.connection() as conn:
+        cube = rebuild(conn) if argv == ["rebuild"] else refresh(conn, Cube.load())
+    cube.save()
+    print(f"Cube of {cube.rows} rows over {len(cube.counts)} months ({cube.counts.nbytes // 1024} KiB) written to {CUBE_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
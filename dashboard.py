@@ -1,6 +1,103 @@
 import streamlit as st 
 import pandas as pd
 import plotly.express as px 
+import altair as alt
+import mysql.connector
+import cube
+
+COLOR_THEMES = ['blues', 'cividis', 'greens', 'inferno', 'magma', 'plasma', 'reds', 'rainbow', 'turbo', 'viridis']
+
+FILTER_LABELS = {
+    'deal_type': 'Deal Type',
+    'review_type': 'Review Type',
+    'escalation_type': 'Escalation Type',
+    'EDD_reviewer': 'Reviewer',
+    'EDD_measures': 'EDD Measures',
+}
+
+
+def make_bar_chart(totals, dimension, color_theme):
+    df = totals.reset_index()
+    return alt.Chart(df).mark_bar().encode(
+        x=alt.X(dimension, sort=None),
+        y='entries',
+        color=alt.Color(dimension, scale=alt.Scale(scheme=color_theme))
+    ).properties(height=300)
+
+
+def make_line_chart(totals, color_theme):
+    df = totals.reset_index()
+    return alt.Chart(df).mark_line(point=True).encode(
+        x='month',
+        y='entries',
+        color=alt.Color('deal_type', scale=alt.Scale(scheme=color_theme))
+    ).properties(height=300)
+
+
+def make_pie_chart(totals):
+    df = totals[totals > 0].reset_index()
+    return px.pie(df, names='escalation_type', values='entries', title='Distribution of Escalation Types', color_discrete_sequence=px.colors.sequential.Blues)
+
+
+def make_heatmap(totals, color_theme):
+    df = totals.unstack('EDD_measures')
+    return px.imshow(df, text_auto=True, aspect='auto', color_continuous_scale=color_theme, title='EDD Measures by Reviewer')
+
 
 def show():
-    pass  # To be implemented
\ No newline at end of file
+    st.title("Compliance Dashboard")
+
+    try:
+        # Precomputed counts; only entries newer than the saved cube are read
+        onboarding_cube = cube.current()
+    except mysql.connector.Error as err:
+        st.error(f"Error loading dashboard data: {err}")
+        return
+
+    months = onboarding_cube.months
+    if not len(months):
+        st.warning("No entries to show yet.")
+        return
+
+    with st.sidebar:
+        st.title('📊 Compliance Dashboard')
+        filters = {
+            dim: st.multiselect(f'Select {label}', cube.labels(dim), key=f'dashboard_{dim}')
+            for dim, label in FILTER_LABELS.items()
+        }
+        month_labels = months.astype(str).tolist()
+        first, last = st.select_slider('Completion Months', options=month_labels, value=(month_labels[0], month_labels[-1]))
+        selected_color_theme = st.selectbox('Select a Color Theme', COLOR_THEMES)
+
+    # Every view below is a slice-and-sum of the cube, never a scan of the rows
+    period = {'start_month': pd.Period(first, freq='M'), 'end_month': pd.Period(last, freq='M')}
+    by_deal_type = onboarding_cube.totals('deal_type', filters, **period)
+    total = int(by_deal_type.sum())
+    if total == 0:
+        st.warning("No entries match the selected filters.")
+        return
+    by_reviewer = onboarding_cube.totals('EDD_reviewer', filters, **period)
+    by_escalation = onboarding_cube.totals('escalation_type', filters, **period)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Entries", f"{total:,}")
+    col2.metric("Active Reviewers", int((by_reviewer.drop(cube.OTHER, errors='ignore') > 0).sum()))
+    col3.metric("Top Escalation Type", by_escalation.idxmax())
+
+    st.subheader("Interactive Visualizations")
+    left, right = st.columns(2)
+    with left:
+        st.write("Entries by Deal Type")
+        st.altair_chart(make_bar_chart(by_deal_type, 'deal_type', selected_color_theme), use_container_width=True)
+    with right:
+        st.write("Entries by Reviewer")
+        st.altair_chart(make_bar_chart(by_reviewer, 'EDD_reviewer', selected_color_theme), use_container_width=True)
+
+    st.write("Monthly Entries by Deal Type")
+    st.altair_chart(make_line_chart(onboarding_cube.totals(['month', 'deal_type'], filters, **period), selected_color_theme), use_container_width=True)
+
+    left, right = st.columns(2)
+    with left:
+        st.plotly_chart(make_pie_chart(by_escalation), use_container_width=True)
+    with right:
+        st.plotly_chart(make_heatmap(onboarding_cube.totals(['EDD_reviewer', 'EDD_measures'], filters, **period), selected_color_theme), use_container_width=True)
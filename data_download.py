@@ -1,44 +1,57 @@
 import streamlit as st
 import pandas as pd
 import mysql.connector
-from io import BytesIO
 from st_aggrid import AgGrid, GridOptionsBuilder, JsCode, ColumnsAutoSizeMode, GridUpdateMode, DataReturnMode
 import plotly.express as px
-import time
 import altair as alt
+import rollup
+import db
+import result_cache
+import export
+import snapshot
+from frames import concat_typed
 
-# Replace these with your actual MySQL server details
-MYSQL_HOST = "localhost"
-MYSQL_USER = "root"
-MYSQL_PASSWORD = "root"
-MYSQL_DATABASE = "TERRAPAY"
+# Rows shown in the grid; exports and aggregates stream the full table instead
+PREVIEW_ROWS = 1000
 
-def fetch_data():
+def iter_data(chunk_size=None):
+    # The whole table as DataFrame chunks from an unbuffered cursor
+    return db.stream("SELECT * FROM onboarding", chunk_size=chunk_size)
+
+def fetch_data(limit=PREVIEW_ROWS):
     try:
-        conn = mysql.connector.connect(
-            host=MYSQL_HOST,
-            user=MYSQL_USER,
-            password=MYSQL_PASSWORD,
-            database=MYSQL_DATABASE
-        )
-        query = "SELECT * FROM onboarding"
-        df = pd.read_sql(query, conn)
-        conn.close()
+        with db.connection() as conn:
+            # The latest entries, read backwards along idx_onboarding_timestamp
+            query = "SELECT * FROM onboarding ORDER BY timestamp DESC LIMIT %s"
+            df = result_cache.cached(conn, ('fetch_data', limit), lambda: concat_typed(db.iter_chunks(conn, query, (limit,))))
         return df
     except mysql.connector.Error as err:
         st.error(f"Error fetching data: {err}")
         return pd.DataFrame()
 
+def fetch_aggregates():
+    # Per-reviewer and monthly counts come from the daily rollup, not the raw table
+    try:
+        with db.connection() as conn:
+            reviewer_df, monthly_df = result_cache.cached(conn, ('fetch_aggregates',), lambda: (rollup.fetch_reviewer_totals(conn), rollup.fetch_monthly_totals(conn)))
+        return reviewer_df, monthly_df
+    except mysql.connector.Error as err:
+        st.error(f"Error fetching aggregates: {err}")
+        return pd.DataFrame(), pd.DataFrame()
+
 def to_csv(df):
     return df.to_csv(index=False).encode('utf-8')
 
+def count_rows():
+    # Row count for the export progress bar; the cache watermark query already has it
+    with db.connection() as conn:
+        return result_cache.watermark(conn)[1]
 
-def to_excel(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Sheet1')
-    processed_data = output.getvalue()
-    return processed_data
+def progress_reporter(progress_bar, total_rows):
+    def report(rows_written):
+        fraction = min(rows_written / total_rows, 1.0) if total_rows else 1.0
+        progress_bar.progress(fraction, text=f"{rows_written:,} of {total_rows:,} rows written")
+    return report
 
 
 def show():
@@ -46,9 +59,17 @@ def show():
     st.subheader("Download the data from the database")
 
     df = fetch_data()
+    reviewer_df, monthly_df = fetch_aggregates()
+
+    cache_stats = result_cache.stats()
+    pool_stats = db.pool_stats()
+    st.caption(
+        f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses | "
+        f"Pool wait: avg {pool_stats['wait_avg'] * 1000:.1f} ms, max {pool_stats['wait_max'] * 1000:.1f} ms"
+    )
 
     if not df.empty:
-        st.write("Data preview:")
+        st.write(f"Data preview (latest {PREVIEW_ROWS} entries):")
         
         # AgGrid display with advanced features
         gb = GridOptionsBuilder.from_dataframe(df)
@@ -190,38 +211,68 @@ def show():
         # Display aggregated values
         agg_sel =st.toggle("Aggregated Data",)
         if agg_sel:
-            agg_data = df.groupby('EDD_reviewer').agg({'EDD_measures': 'count', 'escalation_type': 'count'}).reset_index()
+            agg_data = reviewer_df[['EDD_reviewer', 'EDD_measures', 'escalation_type']]
             st.write(agg_data)
 
         
         # Main data download option
         st.error("Download Main Data")
-        download_option = st.selectbox("Select format to download", ["CSV", "Excel"], key="main_download_option")
+        # Parquet and Arrow IPC need the optional pyarrow package
+        formats = ["CSV", "Excel"] + (["Parquet", "Arrow IPC"] if export.ARROW_AVAILABLE else [])
+        download_option = st.selectbox("Select format to download", formats, key="main_download_option")
+        compress = download_option == "CSV" and st.checkbox("Compress CSV (gzip)", key="main_download_gzip")
 
         if st.button("Download Main Data"):
-            st.write("Preparing the download...")
-            progress_bar = st.progress(0)
-
-            for percent_complete in range(100):
-                time.sleep(0.01)
-                progress_bar.progress(percent_complete + 1)
+            try:
+                if download_option == "CSV":
+                    progress_bar = st.progress(0.0, text="Preparing the download...")
+                    # Streamed from the cursor into a temp file; only one chunk is in memory at a time
+                    path = export.write_csv(iter_data(), compress=compress, progress=progress_reporter(progress_bar, count_rows()))
+                    st.download_button(
+                        label="Download as CSV",
+                        data=export.read_and_remove(path),
+                        **export.csv_download_args(compress, 'data'),
+                    )
+                elif download_option == "Excel":
+                    progress_bar = st.progress(0.0, text="Preparing the download...")
+                    # Raw rows streamed in constant memory, plus the two aggregates on their own sheets
+                    path = export.write_excel(
+                        iter_data(),
+                        extra_sheets={'By Reviewer': reviewer_df, 'Monthly': monthly_df},
+                        progress=progress_reporter(progress_bar, count_rows()),
+                    )
+                    st.download_button(
+                        label="Download as Excel",
+                        data=export.read_and_remove(path),
+                        file_name='data.xlsx',
+                        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                    )
+                else:
+                    progress_bar = st.progress(0.0, text="Preparing the download...")
+                    # One row group / record batch per streamed chunk, string columns dictionary-encoded
+                    write = export.write_parquet if download_option == "Parquet" else export.write_arrow
+                    path = write(iter_data(), schema=snapshot.ONBOARDING_SCHEMA, progress=progress_reporter(progress_bar, count_rows()))
+                    st.download_button(
+                        label=f"Download as {download_option}",
+                        data=export.read_and_remove(path),
+                        **export.download_args(download_option, 'data'),
+                    )
+            except mysql.connector.Error as err:
+                st.error(f"Error exporting data: {err}")
 
-            if download_option == "CSV":
-                data = to_csv(df)
-                st.download_button(
-                    label="Download as CSV",
-                    data=data,
-                    file_name='data.csv',
-                    mime='text/csv',
-                )
-            elif download_option == "Excel":
-                data = to_excel(df)
-                st.download_button(
-                    label="Download as Excel",
-                    data=data,
-                    file_name='data.xlsx',
-                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                )
+        # Parquet snapshot read by the report pages instead of MySQL
+        if export.ARROW_AVAILABLE:
+            st.subheader("Snapshot")
+            if snapshot.available():
+                snapshot_info = snapshot.info()
+                st.write(f"Current snapshot: {snapshot_info['rows']:,} rows taken at {snapshot_info['taken_at']}")
+            if st.button("Refresh Snapshot"):
+                try:
+                    progress_bar = st.progress(0.0, text="Writing the snapshot...")
+                    snapshot_info = snapshot.refresh(progress=progress_reporter(progress_bar, count_rows()))
+                    st.success(f"Snapshot of {snapshot_info['rows']:,} rows written.")
+                except mysql.connector.Error as err:
+                    st.error(f"Error writing snapshot: {err}")
         
         # Aggregated data and visualizations
         st.subheader("Aggregated Data and Visualizations")
@@ -229,7 +280,7 @@ def show():
         # Aggregated data by EDD Reviewer
         with st.expander("EDD Reviewer"):
             st.write("Aggregated data based on EDD Reviewer:")
-            agg_df_1 = df.groupby('EDD_reviewer').agg({'escalation_type': 'count', 'EDD_measures': 'count'}).reset_index()
+            agg_df_1 = reviewer_df
             AgGrid(agg_df_1, fit_columns_on_grid_load=True, theme="alpine")
             fig1 = px.bar(agg_df_1, x='EDD_reviewer', y=['escalation_type', 'EDD_measures'], barmode='group', title="Count of Escalation Tasks and EDD Measures by Reviewer")
             st.plotly_chart(fig1)
@@ -239,8 +290,7 @@ def show():
         # Aggregated data by Month
         with st.expander("Monthly Performance"):
             st.write("Aggregated data based on Month:")
-            df['completion_month'] = pd.to_datetime(df['completion_date']).dt.to_period('M').astype(str)
-            agg_df_2 = df.groupby('completion_month').agg({'escalation_type': 'count', 'EDD_measures': 'count'}).reset_index()
+            agg_df_2 = monthly_df
             AgGrid(agg_df_2, fit_columns_on_grid_load=True, theme="alpine")
             fig2 = px.line(agg_df_2, x='completion_month', y=['escalation_type', 'EDD_measures'], title="Monthly Count of Escalation Tasks and EDD Measures")
             st.plotly_chart(fig2)
@@ -0,0 +1,31 @@
+import streamlit as st
+import mysql.connector
+import bulk_import
+
+
+def show():
+    st.title("Bulk Upload")
+    st.subheader("Import historical onboarding records from a CSV or Excel file")
+
+    uploaded_file = st.file_uploader("Choose a file", type=["csv", "xlsx", "xls"])
+    chunk_size = st.number_input("Rows per batch", min_value=100, max_value=100000, value=bulk_import.CHUNK_SIZE, step=1000)
+
+    if uploaded_file is not None and st.button("Import"):
+        status = st.empty()
+
+        def report(rows, rate):
+            status.write(f"{rows:,} rows imported ({rate:,.0f} rows/s)")
+
+        try:
+            result = bulk_import.import_file(uploaded_file, uploaded_file.name, int(chunk_size), progress=report)
+            st.success(
+                f"Imported {result['rows_inserted']:,} new of {result['rows_read']:,} rows in "
+                f"{result['seconds']:.2f}s ({result['rows_per_second']:,.0f} rows/s)"
+            )
+            warning = bulk_import.unparseable_warning(result)
+            if warning:
+                st.warning(warning)
+        except mysql.connector.Error as err:
+            st.error(f"Error importing file: {err}")
+        except ValueError as err:
+            st.error(f"Error reading file: {err}")
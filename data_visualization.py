@@ -1,113 +1,117 @@
-import streamlit as st 
+import streamlit as st
 import pandas as pd
-import plotly.express as px 
 import altair as alt
-import plotly.express as px
-import plotly.graph_objects as go
-import mysql.connector
-'''
-# Page configuration
-st.set_page_config(
-    
-    page_title="Compliance Dashboard",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Sample data
-data = {
-    "partner_name": ["Partner A", "Partner B", "Partner C", "Partner D"],
-    "deal_type": ["imt", "payments", "issuance", "vendor"],
-    "completion_date": ["2023-01-01", "2023-01-02", "2023-01-03", "2023-01-04"],
-    "review_type": ["fresh_onboarding", "periodic_review", "fresh_onboarding", "periodic_review"],
-    "escalation_type": ["other_red_flags", "adverse_media", "high_risk", "pep_association"],
-    "EDD_reviewer": ["neelima_routhu", "francis_xavier", "rohan_vazapully", "rahil_fw"],
-    "EDD_measures": ["document_review", "aml_review", "audit_review", "feedback_review"],
-    "timestamp": ["2023-01-01 10:00:00", "2023-01-02 11:00:00", "2023-01-03 12:00:00", "2023-01-04 13:00:00"]
+import movie_data
+import movie_query
+
+DEFAULT_GENRES = ['Action', 'Adventure', 'Biography', 'Comedy', 'Drama', 'Horror']
+
+# Label, step and display scale of the range filters of the movie finder
+RANGE_FILTERS = {
+    'title_year': ('Release year', 1.0, 1),
+    'imdb_score': ('IMDb score', 0.1, 1),
+    'budget': ('Budget ($M)', 1.0, 1e6),
+    'gross': ('Gross ($M)', 1.0, 1e6),
+}
+
+CATEGORY_FILTERS = {
+    'country': 'Country',
+    'language': 'Language',
+    'content_rating': 'Content rating',
+    'director_name': 'Director',
 }
 
-df = pd.DataFrame(data)
-
-# Sidebar
-with st.sidebar:
-    st.title('📊 Compliance Dashboard')
-    
-    deal_types = df['deal_type'].unique().tolist()
-    selected_deal_type = st.selectbox('Select Deal Type', deal_types)
-    
-    reviewers = df['EDD_reviewer'].unique().tolist()
-    selected_reviewer = st.selectbox('Select Reviewer', reviewers)
-    
-    escalation_types = df['escalation_type'].unique().tolist()
-    selected_escalation_type = st.selectbox('Select Escalation Type', escalation_types)
-    
-    edd_measures = df['EDD_measures'].unique().tolist()
-    selected_edd_measures = st.selectbox('Select EDD Measures', edd_measures)
-    
-    color_theme_list = ['blues', 'cividis', 'greens', 'inferno', 'magma', 'plasma', 'reds', 'rainbow', 'turbo', 'viridis']
-    selected_color_theme = st.selectbox('Select a Color Theme', color_theme_list)
-
-# Filter data based on sidebar selections
-df_filtered = df[
-    (df['deal_type'] == selected_deal_type) & 
-    (df['EDD_reviewer'] == selected_reviewer) & 
-    (df['escalation_type'] == selected_escalation_type) & 
-    (df['EDD_measures'] == selected_edd_measures)
-]
-
-# Define function for a bar chart
-def make_bar_chart(df):
-    chart = alt.Chart(df).mark_bar().encode(
-        x='deal_type',
-        y='count(partner_name)',
-        color=alt.Color('deal_type', scale=alt.Scale(scheme=selected_color_theme))
-    ).properties(
-        width=400,
-        height=300
-    )
-    return chart
-
-# Define function for a line chart
-def make_line_chart(df):
-    chart = alt.Chart(df).mark_line().encode(
-        x='completion_date',
-        y='count(partner_name)',
-        color=alt.Color('deal_type', scale=alt.Scale(scheme=selected_color_theme))
-    ).properties(
-        width=400,
-        height=300
-    )
-    return chart
-
-# Define function for a pie chart
-def make_pie_chart(df):
-    chart = px.pie(df, names='escalation_type', title='Distribution of Escalation Types', color_discrete_sequence=px.colors.sequential.Blues)
-    return chart
-
-# Define function for a scatter plot
-def make_scatter_plot(df):
-    chart = px.scatter(df, x='partner_name', y='EDD_measures', title='EDD Measures vs Partner Names', color='deal_type', color_continuous_scale=selected_color_theme)
-    return chart
-
-# Main Panel
-st.title("Compliance Dashboard")
-st.subheader("Interactive Visualizations")
-
-# Create containers for each chart
-with st.container():
-    st.write("Bar Chart")
-    st.altair_chart(make_bar_chart(df_filtered), use_container_width=True)
-    
-with st.container():
-    st.write("Line Chart")
-    st.altair_chart(make_line_chart(df_filtered), use_container_width=True)
-    
-with st.container():
-    st.write("Pie Chart")
-    st.plotly_chart(make_pie_chart(df_filtered))
-    
-with st.container():
-    st.write("Scatter Plot")
-    st.plotly_chart(make_scatter_plot(df_filtered))
-'''
\ No newline at end of file
+
+def range_filter(index, column):
+    """A slider over the column's range; None while it spans everything (so movies without a value stay)."""
+    label, step, scale = RANGE_FILTERS[column]
+    low, high = index.ranges[column].bounds
+    low, high = float(low / scale), float(high / scale)
+    if step >= 1:
+        low, high = float(int(low)), float(int(high) + 1)
+    selected = st.slider(label, low, high, (low, high), step=step, key=f'movie_{column}')
+    if selected == (low, high):
+        return None
+    return selected[0] * scale, selected[1] * scale
+
+
+def show_movie_finder():
+    st.subheader('Find movies')
+    try:
+        # Metadata indexed once per process; every filter below is an index lookup
+        index = movie_query.movie_index()
+    except FileNotFoundError as err:
+        st.error(f"Movie metadata not found: {err}")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        ranges = {column: range_filter(index, column) for column in RANGE_FILTERS}
+    with col2:
+        genres = st.multiselect('Genres', index.bitmaps['genres'].options(), key='movie_genres')
+        all_genres = st.toggle('Match all selected genres', key='movie_all_genres')
+        categories = {
+            column: st.multiselect(label, index.bitmaps[column].options(), key=f'movie_{column}')
+            for column, label in CATEGORY_FILTERS.items()
+        }
+
+    filters = {
+        'ranges': {column: bounds for column, bounds in ranges.items() if bounds is not None},
+        'categories': categories,
+        'genres': genres,
+        'all_genres': all_genres,
+    }
+    sort_by = st.selectbox('Sort by', list(RANGE_FILTERS), index=1, format_func=lambda column: RANGE_FILTERS[column][0])
+    rows = index.match(**filters)
+    matches = index.take(rows, sort_by=sort_by, limit=500)
+    st.write(f"{len(rows):,} movies match (showing the first {len(matches)})")
+    st.dataframe(matches, use_container_width=True, hide_index=True)
+
+
+def show():
+    st.title('📊 Interactive Data Explorer')
+
+    # App description - Explain functionalities in an expander box
+    with st.expander('About this app'):
+        st.markdown('**What can this app do?**')
+        st.info('This app shows the use of Pandas for data wrangling, Altair for chart creation and editable dataframe for data interaction.')
+        st.markdown('**How to use the app?**')
+        st.warning('To engage with the app, 1. Select genres of your interest in the drop-down selection box and then 2. Select the year duration from the slider widget. As a result, this should generate an updated editable DataFrame and line plot.')
+
+    # Question header
+    st.subheader('Which Movie Genre performs ($) best at the box office?')
+
+    # Year x genre gross matrix, loaded and pivoted once per process
+    try:
+        matrix = movie_data.gross_matrix()
+    except FileNotFoundError as err:
+        st.error(f"Movie summary not found: {err}")
+        return
+
+    # Genres selection - Create dropdown menu for genre selection
+    genres_selection = st.multiselect('Select genres', matrix.genres, [genre for genre in DEFAULT_GENRES if genre in matrix.genres])
+
+    # Year selection - Create slider for year range selection
+    first_year, last_year = int(matrix.years[0]), int(matrix.years[-1])
+    year_selection = st.slider('Select year duration', first_year, last_year, (max(2000, first_year), min(2016, last_year)))
+
+    # Subset data - a slice of the pre-pivoted matrix
+    reshaped_df = matrix.select(genres_selection, *year_selection)
+
+    # Editable DataFrame - Allow users to made live edits to the DataFrame
+    df_editor = st.data_editor(reshaped_df, height=212, use_container_width=True,
+                                column_config={"year": st.column_config.TextColumn("Year")},
+                                num_rows="dynamic")
+
+    # Data preparation - Prepare data for charting
+    df_chart = pd.melt(df_editor.reset_index(), id_vars='year', var_name='genre', value_name='gross')
+
+    # Display line chart
+    chart = alt.Chart(df_chart).mark_line().encode(
+                x=alt.X('year:N', title='Year'),
+                y=alt.Y('gross:Q', title='Gross earnings ($)'),
+                color='genre:N'
+                ).properties(height=320)
+    st.altair_chart(chart, use_container_width=True)
+
+    show_movie_finder()
@@ -0,0 +1,199 @@
+"""Shared MySQL access for every page.
+
+One process-wide connection pool, configured from the environment (or .env):
+
+    MYSQL_HOST, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE
+    MYSQL_POOL_SIZE     connections kept open (default 5, at most 32)
+    MYSQL_POOL_TIMEOUT  seconds to wait for a free connection (default 10)
+    MYSQL_STREAM_CHUNK  rows per chunk yielded by stream() (default 10000)
+
+Pooled connections run in autocommit mode so reads never hold a stale snapshot across
+checkouts; writes go through transaction().
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import pandas as pd
+from dotenv import load_dotenv
+from mysql.connector import pooling, errors
+
+load_dotenv()
+
+MYSQL_HOST = os.getenv("MYSQL_HOST", "localhost")
+MYSQL_USER = os.getenv("MYSQL_USER", "root")
+MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "root")
+MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "TERRAPAY")
+POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", 5))
+POOL_TIMEOUT = float(os.getenv("MYSQL_POOL_TIMEOUT", 10))
+STREAM_CHUNK_SIZE = int(os.getenv("MYSQL_STREAM_CHUNK", 10000))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# {statement text: prepared cursor} per server session (connection id), least recently checked
+# out first. The pool opens POOL_SIZE sessions up front, so a new id past those is a reconnect.
+_prepared = OrderedDict()
+_prepared_lock = threading.Lock()
+
+# Statements issued by the current thread (one Streamlit rerun) since reset_query_count()
+_queries = threading.local()
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    'checkouts': 0,
+    'wait_total': 0.0,
+    'wait_max': 0.0,
+    'timeouts': 0,
+    'reconnects': 0,
+}
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name="onboarding",
+                    pool_size=POOL_SIZE,
+                    # Keep the session (and its prepared statements) when a connection is returned
+                    pool_reset_session=False,
+                    autocommit=True,
+                    host=MYSQL_HOST,
+                    user=MYSQL_USER,
+                    password=MYSQL_PASSWORD,
+                    database=MYSQL_DATABASE
+                )
+    return _pool
+
+
+def _checkout():
+    pool = get_pool()
+    started = time.perf_counter()
+    delay = 0.005
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except errors.PoolError:
+            # The pool doesn't block when exhausted; back off and retry until the timeout
+            if time.perf_counter() - started > POOL_TIMEOUT:
+                with _metrics_lock:
+                    _metrics['timeouts'] += 1
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+    waited = time.perf_counter() - started
+
+    # get_connection() is the health check: it pings the server and reopens a dropped
+    # connection. A new connection id means the old session's prepared statements are gone;
+    # the session it replaced is most likely the one least recently checked out, so drop that.
+    with _prepared_lock:
+        reconnected = conn.connection_id not in _prepared and len(_prepared) >= POOL_SIZE
+        _prepared.setdefault(conn.connection_id, {})
+        _prepared.move_to_end(conn.connection_id)
+        while len(_prepared) > POOL_SIZE:
+            _prepared.popitem(last=False)
+
+    with _metrics_lock:
+        _metrics['checkouts'] += 1
+        _metrics['wait_total'] += waited
+        _metrics['wait_max'] = max(_metrics['wait_max'], waited)
+        _metrics['reconnects'] += reconnected
+    return conn
+
+
+@contextmanager
+def connection():
+    """Check a healthy connection out of the pool and return it afterwards."""
+    conn = _checkout()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def transaction():
+    """A pooled connection inside one transaction, committed on success and rolled back on error."""
+    with connection() as conn:
+        conn.start_transaction()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def count_query():
+    _queries.count = getattr(_queries, 'count', 0) + 1
+
+
+def reset_query_count():
+    """Start counting the statements of a new rerun; returns the previous count."""
+    count = query_count()
+    _queries.count = 0
+    return count
+
+
+def query_count():
+    return getattr(_queries, 'count', 0)
+
+
+def read_sql(query, conn, params=None):
+    """pd.read_sql() counted by query_count()."""
+    count_query()
+    return pd.read_sql(query, conn, params=params)
+
+
+def iter_chunks(conn, query, params=(), chunk_size=None):
+    """Run query on conn with an unbuffered cursor and yield the result as DataFrames of chunk_size rows.
+
+    Rows are pulled from the server as the chunks are consumed, so memory depends on the chunk
+    size, not on the size of the result.
+    """
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    c = conn.cursor(buffered=False)
+    try:
+        count_query()
+        c.execute(query, params)
+        columns = c.column_names
+        while True:
+            rows = c.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        # A stream abandoned half-way must drain its result before the connection is reused
+        if conn.unread_result:
+            conn.consume_results()
+        c.close()
+
+
+def stream(query, params=(), chunk_size=None):
+    """iter_chunks() on a connection of its own, returned to the pool when the stream ends."""
+    with connection() as conn:
+        yield from iter_chunks(conn, query, params, chunk_size)
+
+
+def execute_prepared(conn, query, params):
+    """Execute query as a server-side prepared statement, reusing it across checkouts of the connection."""
+    with _prepared_lock:
+        cursors = _prepared.setdefault(conn.connection_id, {})
+    cursor = cursors.get(query)
+    if cursor is None:
+        cursor = cursors[query] = conn.cursor(prepared=True)
+    count_query()
+    cursor.execute(query, params)
+    return cursor
+
+
+def pool_stats():
+    with _metrics_lock:
+        stats = dict(_metrics)
+    stats['pool_size'] = POOL_SIZE
+    stats['wait_avg'] = stats['wait_total'] / stats['checkouts'] if stats['checkouts'] else 0.0
+    return stats
@@ -0,0 +1,204 @@
+"""Chunked file exports.
+
+Exports are written chunk by chunk to a temporary file instead of building the whole file in
+memory from a full DataFrame, and report the rows actually written through a progress callback.
+"""
+import gzip
+import os
+import tempfile
+import xlsxwriter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Arrow exports are optional; CSV and Excel work without pyarrow
+    pa = pq = None
+
+ARROW_AVAILABLE = pa is not None
+
+CHUNK_SIZE = 10000
+
+
+def iter_frame(df, chunk_size=CHUNK_SIZE):
+    """Slice an in-memory DataFrame into chunks so it can go through the same pipeline."""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def write_csv(chunks, compress=False, progress=None):
+    """Write DataFrame chunks as one CSV (optionally gzip-compressed) file; returns its path.
+
+    progress(rows_written) is called after every chunk.
+    """
+    suffix = '.csv.gz' if compress else '.csv'
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    rows_written = 0
+    try:
+        opener = gzip.open if compress else open
+        with opener(path, 'wt', encoding='utf-8', newline='') as f:
+            for chunk in chunks:
+                chunk.to_csv(f, index=False, header=(rows_written == 0))
+                rows_written += len(chunk)
+                if progress:
+                    progress(rows_written)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def _write_rows(worksheet, first_row, chunk, colors=None, fill_format=None):
+    # Missing values become blank cells; NaN would otherwise be rejected by xlsxwriter
+    values = chunk.astype(object).where(chunk.notna(), None)
+    for offset, row in enumerate(values.itertuples(index=False, name=None)):
+        if colors is None:
+            worksheet.write_row(first_row + offset, 0, row)
+        else:
+            for col, value in enumerate(row):
+                worksheet.write(first_row + offset, col, value, fill_format(colors[col, offset]))
+
+
+def write_excel(chunks, sheet_name='Data', extra_sheets=None, progress=None, fill_colors=None):
+    """Write DataFrame chunks to one sheet of an .xlsx file; returns its path.
+
+    The workbook is opened in xlsxwriter's constant_memory mode, so every row is flushed to disk
+    as soon as the next one starts and memory stays flat however many rows are exported.
+    extra_sheets ({sheet name: DataFrame}) are small tables, such as aggregates, written after
+    the streamed sheet. fill_colors(chunk), e.g. styling.fill_colors, gives the (columns x rows)
+    cell background colors of the streamed sheet. progress(rows_written) is called after every
+    chunk.
+    """
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd',
+        'remove_timezone': True,
+    })
+    formats = {}
+
+    def fill_format(color):
+        # One format object per distinct color
+        if color not in formats:
+            formats[color] = workbook.add_format({'bg_color': color, 'border': 1})
+        return formats[color]
+
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        rows_written = 0
+        for chunk in chunks:
+            if rows_written == 0:
+                worksheet.write_row(0, 0, list(chunk.columns))
+            colors = fill_colors(chunk) if fill_colors else None
+            _write_rows(worksheet, rows_written + 1, chunk, colors, fill_format)
+            rows_written += len(chunk)
+            if progress:
+                progress(rows_written)
+
+        for name, df in (extra_sheets or {}).items():
+            sheet = workbook.add_worksheet(name)
+            sheet.write_row(0, 0, list(df.columns))
+            _write_rows(sheet, 1, df)
+        workbook.close()
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def _record_batches(chunks, schema, progress):
+    # Every chunk becomes one record batch (one Parquet row group) cast to the same schema
+    rows_written = 0
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+        if schema is None:
+            schema = table.schema.remove_metadata()
+            table = table.cast(schema)
+        yield table
+        rows_written += len(chunk)
+        if progress:
+            progress(rows_written)
+
+
+def write_parquet(chunks, schema=None, progress=None, metadata=None):
+    """Write DataFrame chunks as a Parquet file, one row group per chunk; returns its path.
+
+    String columns are dictionary-encoded. Without a schema, the first chunk's inferred schema
+    is used for the whole file. metadata ({key: str}) is stored in the file footer.
+    """
+    if pq is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    fd, path = tempfile.mkstemp(suffix='.parquet')
+    os.close(fd)
+    writer = None
+    try:
+        for table in _record_batches(chunks, schema, progress):
+            if writer is None:
+                file_schema = table.schema.with_metadata(metadata) if metadata else table.schema
+                string_columns = [field.name for field in table.schema if pa.types.is_string(field.type)]
+                writer = pq.ParquetWriter(path, file_schema, use_dictionary=string_columns, compression='zstd')
+            writer.write_table(table.cast(file_schema), row_group_size=len(table))
+        if writer is None and schema is not None:
+            writer = pq.ParquetWriter(path, schema.with_metadata(metadata) if metadata else schema)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        os.remove(path)
+        raise
+    if writer is not None:
+        writer.close()
+    return path
+
+
+def write_arrow(chunks, schema=None, progress=None):
+    """Write DataFrame chunks as an Arrow IPC file, one record batch per chunk; returns its path."""
+    if pa is None:
+        raise RuntimeError("Arrow export needs pyarrow (pip install pyarrow)")
+    fd, path = tempfile.mkstemp(suffix='.arrow')
+    os.close(fd)
+    writer = None
+    try:
+        for table in _record_batches(chunks, schema, progress):
+            if writer is None:
+                writer = pa.ipc.new_file(path, table.schema, options=pa.ipc.IpcWriteOptions(compression='zstd'))
+            writer.write_table(table)
+        if writer is None and schema is not None:
+            writer = pa.ipc.new_file(path, schema)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        os.remove(path)
+        raise
+    if writer is not None:
+        writer.close()
+    return path
+
+
+def read_and_remove(path):
+    """Read a finished export for st.download_button and delete the temporary file."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def csv_download_args(compress, file_stem):
+    """file_name and mime for st.download_button."""
+    if compress:
+        return {'file_name': f'{file_stem}.csv.gz', 'mime': 'application/gzip'}
+    return {'file_name': f'{file_stem}.csv', 'mime': 'text/csv'}
+
+
+DOWNLOAD_ARGS = {
+    'Excel': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'Parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'Arrow IPC': ('.arrow', 'application/vnd.apache.arrow.file'),
+}
+
+
+def download_args(file_format, file_stem):
+    """file_name and mime for st.download_button of a non-CSV export."""
+    suffix, mime = DOWNLOAD_ARGS[file_format]
+    return {'file_name': file_stem + suffix, 'mime': mime}
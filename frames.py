@@ -0,0 +1,73 @@
+"""Typed, compact in-memory representation of onboarding rows.
+
+The option-list columns become pandas Categoricals over the fixed Input Form lists, so they are
+stored (and grouped) as small integer codes instead of Python strings. The dates are parsed once
+into datetime64, and the free-text columns use the pyarrow-backed string dtype when available.
+"""
+import pandas as pd
+from options import DEAL_TYPES, REVIEW_TYPES, ESCALATION_TYPES, EDD_REVIEWERS, EDD_MEASURES
+
+CATEGORY_COLUMNS = {
+    'deal_type': DEAL_TYPES,
+    'review_type': REVIEW_TYPES,
+    'escalation_type': ESCALATION_TYPES,
+    'EDD_reviewer': EDD_REVIEWERS,
+    'EDD_measures': EDD_MEASURES,
+}
+CATEGORY_DTYPES = {col: pd.CategoricalDtype(categories) for col, categories in CATEGORY_COLUMNS.items()}
+DATE_COLUMNS = ['completion_date', 'timestamp']
+TEXT_COLUMNS = ['id', 'partner_name']
+
+try:
+    import pyarrow  # noqa: F401
+    TEXT_DTYPE = 'string[pyarrow]'
+except ImportError:
+    TEXT_DTYPE = 'string'
+
+
+def category_dtype(values, column):
+    """The fixed dtype of column, extended (after the fixed categories) by any unlisted values."""
+    dtype = CATEGORY_DTYPES[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        seen = values.cat.remove_unused_categories().cat.categories
+    else:
+        seen = pd.Index(values.dropna().unique())
+    extra = seen.difference(dtype.categories)
+    if len(extra):
+        # Imported rows can carry values the form doesn't offer; keep them rather than drop them
+        return pd.CategoricalDtype(list(dtype.categories) + sorted(extra))
+    return dtype
+
+
+def typed_frame(df):
+    """Convert the onboarding columns present in df to their compact dtypes.
+
+    Empty strings in the option-list columns are treated as missing, as the reports do.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if col in CATEGORY_COLUMNS:
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.mask(values == '')
+            else:
+                values = values.cat.remove_categories([''] if '' in values.cat.categories else [])
+            columns[col] = values.astype(category_dtype(values, col))
+        elif col in DATE_COLUMNS:
+            columns[col] = pd.to_datetime(values)
+        elif col in TEXT_COLUMNS:
+            columns[col] = values.astype(TEXT_DTYPE)
+        else:
+            columns[col] = values
+    return pd.DataFrame(columns, index=df.index)
+
+
+def concat_typed(chunks):
+    """Concatenate typed_frame() chunks; categoricals stay categorical when chunks saw extra values."""
+    chunks = [typed_frame(chunk) for chunk in chunks]
+    if not chunks:
+        return pd.DataFrame()
+    df = pd.concat(chunks, ignore_index=True)
+    if any(not isinstance(df[col].dtype, pd.CategoricalDtype) for col in CATEGORY_COLUMNS if col in df.columns):
+        df = typed_frame(df)
+    return df
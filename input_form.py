@@ -4,56 +4,23 @@ import plotly.express as px
 import mysql.connector
 from datetime import datetime
 import uuid  # For generating unique entry IDs
+import rollup
+import db
+import write_behind
+from options import DEAL_TYPES, REVIEW_TYPES, ESCALATION_TYPES, EDD_REVIEWERS, EDD_MEASURES
 
-def init_db():
-    try:
-        conn = mysql.connector.connect(
-            host="127.0.0.1",
-            user="root",
-            password="root",
-            database="TERRAPAY"
-        )
-        c = conn.cursor()
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS onboarding (
-                id VARCHAR(255) PRIMARY KEY,
-                completion_date DATE,
-                partner_name VARCHAR(255),
-                deal_type VARCHAR(255),
-                review_type VARCHAR(255),
-                escalation_type VARCHAR(255),
-                EDD_reviewer VARCHAR(255),
-                EDD_measures VARCHAR(255),
-                timestamp TIMESTAMP
-            )
-        ''')
-        conn.commit()
-        c.close()
-        conn.close()
-        #st.write("Database initialized successfully.")
-    except mysql.connector.Error as err:
-        st.error(f"Error initializing database: {err}")
-
+INSERT_QUERY = '''
+    INSERT INTO onboarding (id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+'''
 
 def insert_entry(entry_id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp):
     try:
-        conn = mysql.connector.connect(
-            host="127.0.0.1",
-            user="root",
-            password="root",
-            database="TERRAPAY"
-        )
-        c = conn.cursor()
-        query = '''
-            INSERT INTO onboarding (id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        '''
-        #st.write(f"Executing query: {query}")
-        c.execute(query, (entry_id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp))
-        conn.commit()
-        #st.write(f"Rows affected: {c.rowcount}")
-        c.close()
-        conn.close()
+        with db.transaction() as conn:
+            # The insert is a prepared statement reused across checkouts of the pooled connection
+            db.execute_prepared(conn, INSERT_QUERY, (entry_id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp))
+            # Keep the daily rollup in step; both writes commit or roll back together
+            rollup.increment(conn, completion_date, EDD_reviewer, escalation_type, EDD_measures)
         #st.success(f"Entry submitted successfully at {timestamp}")
     except mysql.connector.Error as err:
         st.error(f"Error inserting entry: {err}")
@@ -79,19 +46,22 @@ def show():
     st.title("Input Form")
     st.subheader("Enter your data below")
 
-    # Initialize the database
-    #st.write("Initializing database...")
-    
-    # Initialize the database
-    init_db()
+    # The schema is created by migrations.ensure_schema() once per process (see app.py)
+
+    if write_behind.ENABLED:
+        # Picks up entries left in the journal by a previous process
+        write_behind.start_worker()
+        queued = write_behind.pending()
+        if queued:
+            st.caption(f"{queued} submitted entries are waiting to be written to the database.")
 
     completion_date = st.date_input("Completion Date", value=datetime.today())
     partner_name = st.text_input("Partner Name")
-    deal_type = st.selectbox("Deal Type", ['', 'imt', 'payments', 'issuance', 'vendor'])
-    review_type = st.selectbox("Review Type", ['', 'fresh_onboarding', 'periodic_review'])
-    escalation_type = st.selectbox("Escalation Type", ['', 'other_red_flags', 'adverse_media', 'high_risk', 'pep_association', 'country_risk', 'complex_ownership', 'young_company', 'medium_risk', 'feedback_review'])
-    EDD_reviewer = st.selectbox("EDD Reviewer", ['', 'neelima_routhu', 'francis_xavier', 'rohan_vazapully', 'rahil_fw', 'moustapha', 'laura_castillo', 'hityshi'])
-    EDD_measures = st.selectbox("EDD Measures", ['', 'document_review', 'aml_review', 'audit_review', 'feedback_review'])
+    deal_type = st.selectbox("Deal Type", [''] + DEAL_TYPES)
+    review_type = st.selectbox("Review Type", [''] + REVIEW_TYPES)
+    escalation_type = st.selectbox("Escalation Type", [''] + ESCALATION_TYPES)
+    EDD_reviewer = st.selectbox("EDD Reviewer", [''] + EDD_REVIEWERS)
+    EDD_measures = st.selectbox("EDD Measures", [''] + EDD_MEASURES)
     
     
     if st.button("Submit"):
@@ -110,6 +80,11 @@ def show():
             if escalation_type == '': escalation_type = None
             if EDD_measures == '': EDD_measures = None
 
-            # Insert entry into the database
-            insert_entry(entry_id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp)
-            st.success(f"Entry submitted successfully at {timestamp}")
\ No newline at end of file
+            if write_behind.ENABLED:
+                # Queue the entry locally; the background worker writes it to the database
+                write_behind.enqueue(entry_id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp)
+                st.success(f"Entry queued successfully at {timestamp}")
+            else:
+                # Insert entry into the database
+                insert_entry(entry_id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp)
+                st.success(f"Entry submitted successfully at {timestamp}")
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""Week-over-week and month-over-month KPI deltas for the report cards.
+
+The current period's counts come from the SLA table the page has already built; only the
+comparison periods are read, as the rollup's per-reviewer GROUP BY (or from the snapshot).
+They go through result_cache.cached_period, so a closed period is only reread when the
+watermark has moved. A page that already holds the rows of the comparison periods (see
+comparison_start) passes them in instead, and no query runs at all.
+Comparison periods count every weekday; the current period's skipped dates are not shifted.
+"""
+import numpy as np
+import pandas as pd
+import result_cache
+import rollup
+import snapshot
+from aggregation import COUNT_COLUMNS, aggregate_by_reviewer
+from business_calendar import working_days
+
+# Label and shift of each comparison period
+COMPARISONS = {
+    'WoW': pd.DateOffset(weeks=1),
+    'MoM': pd.DateOffset(months=1),
+}
+
+
+def previous_period(start_date, end_date, offset):
+    return (pd.Timestamp(start_date) - offset).date(), (pd.Timestamp(end_date) - offset).date()
+
+
+def comparison_start(start_date):
+    """First day any comparison period of a report starting on start_date can cover."""
+    return min(previous_period(start_date, start_date, offset)[0] for offset in COMPARISONS.values())
+
+
+def reviewer_totals(start_date, end_date, use_snapshot=False, rows=None):
+    """Entry count per reviewer over the weekdays of the period, as a Series indexed by reviewer.
+
+    rows, when given, are rows or daily rollup counts covering the period, split in memory.
+    """
+    if rows is not None:
+        df = rows[rows['completion_date'].isin(working_days(start_date, end_date))]
+        agg_data = aggregate_by_reviewer(df, count_column='entry_count' if 'entry_count' in df.columns else None)
+    elif use_snapshot:
+        agg_data = aggregate_by_reviewer(snapshot.load_period(start_date, end_date))
+    else:
+        agg_data = result_cache.cached_period(
+            start_date, end_date, 'reviewer_breakdown',
+            lambda conn: rollup.fetch_reviewer_breakdown(conn, start_date, end_date),
+        )
+    count_names = [name for name, *_ in COUNT_COLUMNS]
+    return agg_data.set_index('EDD_reviewer')[count_names].sum(axis=1)
+
+
+def period_deltas(current_table, start_date, end_date, use_snapshot=False, rows=None):
+    """Deltas of an SLA table (see build_sla_table) against the previous week and month.
+
+    Returns one row per reviewer plus 'Total', with the Current count and, per comparison,
+    the Previous count, the Change and the Change % (NaN when the previous count is 0).
+    """
+    current = current_table.set_index('EDD_reviewer')['Total'].drop('Total', errors='ignore')
+    previous = {
+        label: reviewer_totals(*previous_period(start_date, end_date, offset), use_snapshot, rows)
+        for label, offset in COMPARISONS.items()
+    }
+
+    # Reviewers active in either period, then the overall Total row
+    reviewers = pd.Index(sorted(set(current.index).union(*(totals.index for totals in previous.values()))))
+    deltas = pd.DataFrame(index=reviewers)
+    deltas['Current'] = current.reindex(reviewers, fill_value=0)
+    for label, totals in previous.items():
+        deltas[f'{label} Previous'] = totals.reindex(reviewers, fill_value=0)
+    deltas.loc['Total'] = deltas.sum()
+    deltas = deltas.astype('int64')
+
+    for label in previous:
+        before = deltas[f'{label} Previous']
+        deltas[f'{label} Change'] = deltas['Current'] - before
+        deltas[f'{label} Change %'] = np.where(before > 0, deltas[f'{label} Change'] / before.where(before > 0, 1), np.nan)
+    deltas.index.name = 'EDD_reviewer'
+    return deltas
+
+
+def change_summary(deltas, reviewer='Total'):
+    """One-line text of a reviewer's changes, e.g. '+12 WoW (+8.1%), -3 MoM (-2.0%)'."""
+    parts = []
+    for label in COMPARISONS:
+        change = deltas.at[reviewer, f'{label} Change']
+        percent = deltas.at[reviewer, f'{label} Change %']
+        parts.append(f"{change:+d} {label}" + ("" if np.isnan(percent) else f" ({percent:+.1%})"))
+    return ", ".join(parts)
@@ -0,0 +1,142 @@
+"""Versioned schema migrations for the onboarding database.
+
+ensure_schema() applies the pending migrations once per process (app.py calls it at start-up)
+and records each applied version in schema_version. It can also be run by hand:
+
+    python migrations.py
+"""
+import sys
+import threading
+import mysql.connector
+from mysql.connector import errorcode
+import db
+import rollup
+
+SCHEMA_VERSION_TABLE = '''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+CREATE_ONBOARDING_TABLE = '''
+    CREATE TABLE IF NOT EXISTS onboarding (
+        id VARCHAR(255) PRIMARY KEY,
+        completion_date DATE,
+        partner_name VARCHAR(255),
+        deal_type VARCHAR(255),
+        review_type VARCHAR(255),
+        escalation_type VARCHAR(255),
+        EDD_reviewer VARCHAR(255),
+        EDD_measures VARCHAR(255),
+        timestamp TIMESTAMP
+    )
+'''
+
+# Serializes migrations between processes sharing the database
+LOCK_NAME = "onboarding_schema_migrations"
+LOCK_TIMEOUT = 30
+
+
+def _create_index(name, columns):
+    def step(cursor):
+        try:
+            cursor.execute(f"CREATE INDEX {name} ON onboarding ({columns})")
+        except mysql.connector.Error as err:
+            # Databases set up before migrations may already have it; MySQL has no CREATE INDEX IF NOT EXISTS
+            if err.errno != errorcode.ER_DUP_KEYNAME:
+                raise
+    return step
+
+
+def _create_rollup(cursor):
+    cursor.execute(rollup.CREATE_ROLLUP_TABLE)
+    cursor.execute(f"DELETE FROM {rollup.ROLLUP_TABLE}")
+    cursor.execute(rollup.BACKFILL_QUERY)
+
+
+def _add_rollup_value_counts(cursor):
+    try:
+        cursor.execute(
+            f"ALTER TABLE {rollup.ROLLUP_TABLE} "
+            "ADD COLUMN escalation_count INT NOT NULL DEFAULT 0, ADD COLUMN measures_count INT NOT NULL DEFAULT 0"
+        )
+    except mysql.connector.Error as err:
+        # Rollup tables created by migration 3 from the current CREATE_ROLLUP_TABLE already have them
+        if err.errno != errorcode.ER_DUP_FIELDNAME:
+            raise
+    cursor.execute(f"DELETE FROM {rollup.ROLLUP_TABLE}")
+    cursor.execute(rollup.BACKFILL_QUERY)
+
+
+# (version, description, step); versions are applied in order and never edited once released
+MIGRATIONS = [
+    (1, "create onboarding table", lambda cursor: cursor.execute(CREATE_ONBOARDING_TABLE)),
+    (2, "index onboarding.completion_date", _create_index('idx_onboarding_completion_date', 'completion_date')),
+    (3, "daily rollup table, backfilled from onboarding", _create_rollup),
+    (4, "index onboarding.EDD_reviewer", _create_index('idx_onboarding_reviewer', 'EDD_reviewer')),
+    (5, "index onboarding (completion_date, EDD_reviewer)", _create_index('idx_onboarding_date_reviewer', 'completion_date, EDD_reviewer')),
+    # MAX(timestamp) in the cache watermark and the cube's "WHERE timestamp > %s" refresh
+    (6, "index onboarding.timestamp", _create_index('idx_onboarding_timestamp', 'timestamp')),
+    (7, "non-NULL value counts in the daily rollup, backfilled", _add_rollup_value_counts),
+]
+
+_applied = False
+_lock = threading.Lock()
+
+
+def current_version(cursor):
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every pending migration; returns the versions applied."""
+    c = conn.cursor()
+    try:
+        c.execute("SELECT GET_LOCK(%s, %s)", (LOCK_NAME, LOCK_TIMEOUT))
+        if c.fetchone()[0] != 1:
+            raise mysql.connector.Error(msg=f"Timed out waiting for the {LOCK_NAME} lock")
+        try:
+            c.execute(SCHEMA_VERSION_TABLE)
+            version = current_version(c)
+            applied = []
+            for number, description, step in MIGRATIONS:
+                if number <= version:
+                    continue
+                step(c)
+                c.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)", (number, description))
+                applied.append(number)
+            return applied
+        finally:
+            c.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+            c.fetchone()
+    finally:
+        c.close()
+
+
+def ensure_schema():
+    """Bring the schema up to date, at most once per process."""
+    global _applied
+    if _applied:
+        return
+    with _lock:
+        if not _applied:
+            with db.connection() as conn:
+                migrate(conn)
+            _applied = True
+
+
+def main():
+    with db.connection() as conn:
+        applied = migrate(conn)
+        c = conn.cursor()
+        version = current_version(c)
+        c.close()
+    print(f"Applied migrations: {applied or 'none'}; schema version {version}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Year x genre gross matrix behind the genre explorer on the Data Visualization page.
+
+The summary CSV is parsed once per process and mirrored to a Parquet sidecar, so later processes
+read the columnar copy instead. It is then pivoted once into a dense years x genres array; a
+genre / year-range selection is a column take plus a searchsorted row slice of that array.
+
+    MOVIES_SUMMARY_PATH   summary CSV or Parquet (default ./movies_genres_summary.csv)
+    MOVIES_SIDECAR_PATH   Parquet copy (default ./data/movies_genres_summary.parquet)
+"""
+import os
+import threading
+import numpy as np
+import pandas as pd
+import export
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SUMMARY_PATH = os.getenv("MOVIES_SUMMARY_PATH", os.path.join(BASE_DIR, "movies_genres_summary.csv"))
+SIDECAR_PATH = os.getenv("MOVIES_SIDECAR_PATH", os.path.join(BASE_DIR, "data", "movies_genres_summary.parquet"))
+
+_lock = threading.Lock()
+_matrix = None
+
+
+def read_summary(path=SUMMARY_PATH, sidecar_path=SIDECAR_PATH):
+    """The summary rows, from the sidecar when it is at least as new as the CSV.
+
+    A Parquet path (such as the movie_pipeline output) is read directly.
+    """
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    if export.ARROW_AVAILABLE and os.path.exists(sidecar_path) and os.stat(sidecar_path).st_mtime_ns >= os.stat(path).st_mtime_ns:
+        return pd.read_parquet(sidecar_path)
+    df = pd.read_csv(path, dtype={'genre': 'category'})
+    df['year'] = df['year'].astype('int64')
+    if export.ARROW_AVAILABLE:
+        os.makedirs(os.path.dirname(sidecar_path), exist_ok=True)
+        df.to_parquet(sidecar_path + ".tmp", index=False)
+        os.replace(sidecar_path + ".tmp", sidecar_path)
+    return df
+
+
+class GrossMatrix:
+    """Summed gross per (year, genre); years ascending, genres sorted by name."""
+
+    def __init__(self, df):
+        genre = df['genre'].astype('category')
+        self.genres = list(genre.cat.categories)
+        self.years, year_codes = np.unique(df['year'].to_numpy(), return_inverse=True)
+        genre_codes = genre.cat.codes.to_numpy()
+
+        shape = (len(self.years), len(self.genres))
+        self.gross = np.zeros(shape, dtype=np.int64)
+        np.add.at(self.gross, (year_codes, genre_codes), df['gross'].to_numpy(dtype=np.int64))
+        # Which cells have rows at all, so a selection keeps only the years that have data
+        self.present = np.zeros(shape, dtype=bool)
+        self.present[year_codes, genre_codes] = True
+        self._genre_position = {name: i for i, name in enumerate(self.genres)}
+
+    def select(self, genres, first_year, last_year):
+        """The gross of the selected genres over [first_year, last_year], newest year first.
+
+        Same frame as pivot_table(index='year', columns='genre', values='gross', aggfunc='sum',
+        fill_value=0) over the matching rows.
+        """
+        genres = [name for name in genres if name in self._genre_position]
+        columns = [self._genre_position[name] for name in sorted(genres)]
+        low = np.searchsorted(self.years, first_year, side='left')
+        high = np.searchsorted(self.years, last_year, side='right')
+        rows = np.arange(low, high)
+        rows = rows[self.present[low:high][:, columns].any(axis=1)][::-1]
+
+        return pd.DataFrame(
+            self.gross[np.ix_(rows, columns)],
+            index=pd.Index(self.years[rows], name='year'),
+            columns=pd.Index([self.genres[i] for i in columns], name='genre'),
+        )
+
+
+def gross_matrix():
+    """The matrix of the current summary file, built once per process and file version."""
+    global _matrix
+    version = os.stat(SUMMARY_PATH).st_mtime_ns
+    with _lock:
+        if _matrix is None or _matrix[0] != version:
+            _matrix = (version, GrossMatrix(read_summary()))
+        return _matrix[1]
@@ -0,0 +1,179 @@
+"""Derive the year x genre movie summary from movie_metadata.csv.
+
+Each movie's pipe-delimited genres are split and exploded with vectorized string ops, and the
+movies are aggregated per (title_year, genre): the average gross and IMDb score, as in
+movies_genres_summary.csv, plus the number of movies. The summary is written as Parquet; point
+MOVIES_SUMMARY_PATH at it to show it in the genre explorer.
+
+Runs are incremental. Every source row is keyed by a hash of the columns the summary uses, and
+the state keeps each row's exploded contributions and the per-group running sums. A run only
+explodes the rows whose hash is new and subtracts the contributions of the rows that are gone,
+so a changed row counts as one removal plus one addition. An unchanged source file (same SHA-256)
+is skipped without parsing it.
+
+    MOVIES_METADATA_PATH    source CSV (default ./movie_metadata.csv)
+    MOVIES_PIPELINE_DIR     state and output directory (default ./data/movie_pipeline)
+
+    python movie_pipeline.py [--source movie_metadata.csv] [--full]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+METADATA_PATH = os.getenv("MOVIES_METADATA_PATH", os.path.join(BASE_DIR, "movie_metadata.csv"))
+PIPELINE_DIR = os.getenv("MOVIES_PIPELINE_DIR", os.path.join(BASE_DIR, "data", "movie_pipeline"))
+ROWS_PATH = os.path.join(PIPELINE_DIR, "rows.parquet")
+SUMS_PATH = os.path.join(PIPELINE_DIR, "sums.parquet")
+MANIFEST_PATH = os.path.join(PIPELINE_DIR, "manifest.json")
+SUMMARY_PATH = os.path.join(PIPELINE_DIR, "movies_genres_summary.parquet")
+
+SOURCE_COLUMNS = ['genres', 'gross', 'title_year', 'imdb_score']
+GROUP_COLUMNS = ['year', 'genre']
+SUM_COLUMNS = ['movies', 'gross_sum', 'gross_movies', 'imdb_sum', 'imdb_movies']
+
+
+def file_digest(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_source(path):
+    """The summary's source columns, keyed by (row_hash, occurrence).
+
+    occurrence numbers identical rows, so a duplicated movie is counted (and removed) per copy.
+    """
+    df = pd.read_csv(path, usecols=SOURCE_COLUMNS, dtype={'genres': 'string'})
+    df['row_hash'] = pd.util.hash_pandas_object(df[SOURCE_COLUMNS], index=False).to_numpy()
+    df['occurrence'] = df.groupby('row_hash').cumcount().astype('int32')
+    return df
+
+
+def explode_genres(df):
+    """One contribution row per (movie, genre); movies without a year or genres still get a
+    row (with missing keys) so their hash is remembered."""
+    genres = df['genres'].str.strip().str.split('|')
+    exploded = pd.DataFrame({
+        'row_hash': df['row_hash'].array,
+        'occurrence': df['occurrence'].array,
+        'year': df['title_year'].astype('Int64').array,
+        'genre': genres.array,
+        'gross': df['gross'].array,
+        'imdb_score': df['imdb_score'].array,
+    }).explode('genre', ignore_index=True)
+    exploded['genre'] = exploded['genre'].str.strip().replace('', pd.NA).astype('string')
+    return exploded
+
+
+def group_sums(rows):
+    """Running sums per (year, genre) of exploded contribution rows."""
+    rows = rows.dropna(subset=GROUP_COLUMNS)
+    gross_known = rows['gross'].notna()
+    imdb_known = rows['imdb_score'].notna()
+    sums = pd.DataFrame({
+        'year': rows['year'].astype('int64'),
+        'genre': rows['genre'],
+        'movies': 1,
+        'gross_sum': rows['gross'].where(gross_known, 0).astype('int64'),
+        'gross_movies': gross_known.astype('int64'),
+        'imdb_sum': rows['imdb_score'].where(imdb_known, 0.0),
+        'imdb_movies': imdb_known.astype('int64'),
+    })
+    return sums.groupby(GROUP_COLUMNS).sum()
+
+
+def summarize(sums):
+    """The summary table of the running sums: one row per (year, genre) with movies left."""
+    sums = sums[sums['movies'] > 0]
+    gross = sums['gross_sum'] / sums['gross_movies'].where(sums['gross_movies'] > 0)
+    imdb = sums['imdb_sum'] / sums['imdb_movies'].where(sums['imdb_movies'] > 0)
+    return pd.DataFrame({
+        'gross': gross.round().fillna(0).astype('int64'),
+        'imdb_score': imdb.round(1),
+        'movies': sums['movies'].astype('int64'),
+    }).reset_index()[['year', 'gross', 'imdb_score', 'movies', 'genre']]
+
+
+def _load_state():
+    if not all(os.path.exists(path) for path in (ROWS_PATH, SUMS_PATH, MANIFEST_PATH)):
+        return None, None, {}
+    with open(MANIFEST_PATH) as f:
+        manifest = json.load(f)
+    return pd.read_parquet(ROWS_PATH), pd.read_parquet(SUMS_PATH).set_index(GROUP_COLUMNS), manifest
+
+
+def _write(df, path):
+    df.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+
+
+def run(source=METADATA_PATH, full=False):
+    """Bring the summary up to date with source; returns what the run did."""
+    digest = file_digest(source)
+    rows, sums, manifest = (None, None, {}) if full else _load_state()
+    if rows is not None and manifest.get('source_sha256') == digest and os.path.exists(SUMMARY_PATH):
+        return {'skipped': True, 'added': 0, 'removed': 0, 'groups_changed': 0, 'groups': manifest.get('groups', 0)}
+
+    df = read_source(source)
+    if rows is None:
+        rows = explode_genres(df.iloc[:0])
+        sums = group_sums(rows)
+
+    # Match source rows and state rows on their keys; only the differences are processed
+    source_keys = pd.MultiIndex.from_frame(df[['row_hash', 'occurrence']])
+    state_keys = pd.MultiIndex.from_frame(rows[['row_hash', 'occurrence']])
+    added = explode_genres(df[~source_keys.isin(state_keys)])
+    removed_mask = ~state_keys.isin(source_keys)
+    removed = rows[removed_mask]
+
+    delta = group_sums(added).sub(group_sums(removed), fill_value=0)
+    sums = sums.add(delta, fill_value=0)
+    sums = sums[sums['movies'] > 0].astype({col: 'int64' for col in SUM_COLUMNS if col != 'imdb_sum'}).sort_index()
+    rows = pd.concat([rows[~removed_mask], added], ignore_index=True)
+
+    os.makedirs(PIPELINE_DIR, exist_ok=True)
+    summary = summarize(sums)
+    _write(rows, ROWS_PATH)
+    _write(sums.reset_index(), SUMS_PATH)
+    _write(summary, SUMMARY_PATH)
+    # The manifest goes last: after an interrupted run the next one re-diffs the source against the saved rows
+    manifest = {'source': os.path.abspath(source), 'source_sha256': digest, 'groups': len(summary)}
+    with open(MANIFEST_PATH + ".tmp", 'w') as f:
+        json.dump(manifest, f)
+    os.replace(MANIFEST_PATH + ".tmp", MANIFEST_PATH)
+
+    return {
+        'skipped': False,
+        'added': int(added[['row_hash', 'occurrence']].drop_duplicates().shape[0]),
+        'removed': int(removed[['row_hash', 'occurrence']].drop_duplicates().shape[0]),
+        'groups_changed': int(np.count_nonzero(delta.ne(0).any(axis=1))),
+        'groups': len(summary),
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Derive the year x genre movie summary from movie_metadata.csv.")
+    parser.add_argument("--source", default=METADATA_PATH)
+    parser.add_argument("--full", action="store_true", help="ignore the saved state and rebuild")
+    args = parser.parse_args(argv)
+
+    result = run(args.source, args.full)
+    if result['skipped']:
+        print(f"{args.source} is unchanged; {SUMMARY_PATH} is up to date")
+    else:
+        print(
+            f"{result['added']} rows added, {result['removed']} removed, "
+            f"{result['groups_changed']} of {result['groups']} year x genre groups changed; wrote {SUMMARY_PATH}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
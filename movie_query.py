@@ -0,0 +1,210 @@
+"""Indexed filtering over the full movie_metadata.csv.
+
+The metadata is loaded once per process (from a Parquet sidecar after the first parse) into a
+columnar frame, and indexed:
+
+- numeric columns (budget, gross, imdb_score, title_year) get a sorted index: the row order by
+  value plus the sorted values, so a range filter is two searchsorted calls;
+- categorical columns (director, language, country, content rating) and the exploded genres
+  get a bitmap index: one packed bit array per value (posting lists for rare values).
+
+Every filter becomes a packed bitmap and a query ANDs them, so no filter rescans the rows.
+
+    MOVIES_METADATA_PATH    source CSV (default ./movie_metadata.csv)
+    MOVIES_METADATA_SIDECAR Parquet copy (default ./data/movie_metadata.parquet)
+"""
+import os
+import threading
+import numpy as np
+import pandas as pd
+import export
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+METADATA_PATH = os.getenv("MOVIES_METADATA_PATH", os.path.join(BASE_DIR, "movie_metadata.csv"))
+SIDECAR_PATH = os.getenv("MOVIES_METADATA_SIDECAR", os.path.join(BASE_DIR, "data", "movie_metadata.parquet"))
+
+RANGE_COLUMNS = ['budget', 'gross', 'imdb_score', 'title_year']
+BITMAP_COLUMNS = ['director_name', 'language', 'country', 'content_rating']
+DISPLAY_COLUMNS = ['movie_title', 'title_year', 'director_name', 'genres', 'country', 'language', 'content_rating', 'budget', 'gross', 'imdb_score']
+
+_lock = threading.Lock()
+_index = None
+
+
+def read_metadata(path=METADATA_PATH, sidecar_path=SIDECAR_PATH):
+    """The metadata, from the sidecar when it is at least as new as the CSV."""
+    if export.ARROW_AVAILABLE and os.path.exists(sidecar_path) and os.stat(sidecar_path).st_mtime_ns >= os.stat(path).st_mtime_ns:
+        return pd.read_parquet(sidecar_path)
+    df = pd.read_csv(path, dtype={col: 'category' for col in BITMAP_COLUMNS})
+    # Titles carry a trailing non-breaking space in the source
+    df['movie_title'] = df['movie_title'].str.strip()
+    if export.ARROW_AVAILABLE:
+        os.makedirs(os.path.dirname(sidecar_path), exist_ok=True)
+        df.to_parquet(sidecar_path + ".tmp", index=False)
+        os.replace(sidecar_path + ".tmp", sidecar_path)
+    return df
+
+
+class SortedIndex:
+    """Row ids ordered by value; missing values are left out of every range."""
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        known = np.flatnonzero(~np.isnan(values))
+        self.order = known[np.argsort(values[known], kind='stable')]
+        self.values = values[self.order]
+
+    @property
+    def bounds(self):
+        return (self.values[0], self.values[-1]) if len(self.values) else (np.nan, np.nan)
+
+    def rows(self, low=None, high=None):
+        """Row ids with low <= value <= high (either bound may be None)."""
+        start = 0 if low is None else np.searchsorted(self.values, low, side='left')
+        stop = len(self.values) if high is None else np.searchsorted(self.values, high, side='right')
+        return self.order[start:stop]
+
+
+class BitmapIndex:
+    """Packed bitmaps of the rows holding each value; a row can hold several values (genres).
+
+    Values held by fewer than n_rows / 64 rows keep a posting list instead (64-bit row ids take
+    less room than a bitmap then) and get their bitmap built on use, so a high-cardinality
+    column such as director_name costs about one row id per row rather than one bitmap per value.
+    """
+
+    def __init__(self, row_ids, values, n_rows):
+        self.n_rows = n_rows
+        codes, self.labels = pd.factorize(pd.Series(values), sort=True)
+        known = codes >= 0
+        row_ids, codes = np.asarray(row_ids)[known], codes[known]
+        self._position = {label: i for i, label in enumerate(self.labels)}
+        self.counts = np.bincount(codes, minlength=len(self.labels))
+
+        # Posting lists: row ids grouped by value, value i at postings[offsets[i]:offsets[i + 1]]
+        order = np.argsort(codes, kind='stable')
+        self.postings = row_ids[order]
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)])
+        self.dense = {
+            position: self._pack(self.postings[self.offsets[position]:self.offsets[position + 1]])
+            for position in np.flatnonzero(self.counts * 64 >= n_rows)
+        }
+
+    def _pack(self, rows):
+        bits = np.zeros(self.n_rows, dtype=bool)
+        bits[rows] = True
+        return np.packbits(bits)
+
+    def bitmap(self, position):
+        if position in self.dense:
+            return self.dense[position]
+        return self._pack(self.postings[self.offsets[position]:self.offsets[position + 1]])
+
+    def _empty(self):
+        return np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+
+    def any_of(self, values):
+        """Bitmap of the rows holding at least one of values."""
+        positions = [self._position[value] for value in values if value in self._position]
+        sparse = [position for position in positions if position not in self.dense]
+        bitmap = self._pack(np.concatenate([self.postings[self.offsets[p]:self.offsets[p + 1]] for p in sparse])) if sparse else self._empty()
+        for position in positions:
+            if position in self.dense:
+                bitmap = bitmap | self.dense[position]
+        return bitmap
+
+    def all_of(self, values):
+        """Bitmap of the rows holding every one of values."""
+        if not values or any(value not in self._position for value in values):
+            return self._empty()
+        return np.bitwise_and.reduce([self.bitmap(self._position[value]) for value in values])
+
+    def options(self):
+        """Values by number of rows, most common first."""
+        return [self.labels[i] for i in np.argsort(-self.counts, kind='stable')]
+
+
+def split_values(values, sep='|'):
+    """(row ids, values) of a delimited multi-value column, exploded.
+
+    Only the distinct strings are split (genre lists repeat a lot); the per-row pairs are then
+    gathered with numpy.
+    """
+    codes, uniques = pd.factorize(pd.Series(values))
+    parts = [str(unique).split(sep) for unique in uniques]
+    lengths = np.array([len(part) for part in parts], dtype=np.int64)
+    flat = np.array([value for part in parts for value in part], dtype=object)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+    rows = np.flatnonzero(codes >= 0)
+    row_lengths = lengths[codes[rows]]
+    row_ids = np.repeat(rows, row_lengths)
+    # Position of each pair inside its row's list, offset by where that list starts in flat
+    within = np.arange(len(row_ids)) - np.repeat(np.cumsum(row_lengths) - row_lengths, row_lengths)
+    return row_ids, flat[np.repeat(starts[codes[rows]], row_lengths) + within]
+
+
+class MovieIndex:
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        n_rows = len(self.df)
+        self.ranges = {col: SortedIndex(self.df[col].to_numpy(dtype=np.float64, na_value=np.nan)) for col in RANGE_COLUMNS}
+        self.bitmaps = {col: BitmapIndex(np.arange(n_rows), self.df[col].astype(object).to_numpy(), n_rows) for col in BITMAP_COLUMNS}
+
+        # Genres are multi-valued: index the exploded (row, genre) pairs
+        row_ids, genres = split_values(self.df['genres'].to_numpy(dtype=object, na_value=None))
+        self.bitmaps['genres'] = BitmapIndex(row_ids, genres, n_rows)
+        self._all = np.packbits(np.ones(n_rows, dtype=bool))
+
+    def _range_bitmap(self, column, low, high):
+        bits = np.zeros(len(self.df), dtype=bool)
+        bits[self.ranges[column].rows(low, high)] = True
+        return np.packbits(bits)
+
+    def match(self, ranges=None, categories=None, genres=None, all_genres=False):
+        """Row ids matching every filter.
+
+        ranges maps a RANGE_COLUMNS column to (low, high); categories maps a BITMAP_COLUMNS
+        column to the accepted values; genres match any (or with all_genres, every) listed genre.
+        Empty selections don't filter.
+        """
+        bitmap = self._all
+        for column, (low, high) in (ranges or {}).items():
+            bitmap = bitmap & self._range_bitmap(column, low, high)
+        for column, values in (categories or {}).items():
+            if values:
+                bitmap = bitmap & self.bitmaps[column].any_of(values)
+        if genres:
+            index = self.bitmaps['genres']
+            bitmap = bitmap & (index.all_of(genres) if all_genres else index.any_of(genres))
+        return np.flatnonzero(np.unpackbits(bitmap, count=len(self.df)))
+
+    def count(self, **filters):
+        return len(self.match(**filters))
+
+    def take(self, rows, columns=DISPLAY_COLUMNS, sort_by='imdb_score', ascending=False, limit=None):
+        """The movies of match() rows as a DataFrame, sorted by sort_by."""
+        if sort_by in self.ranges:
+            # Walk the sorted index instead of sorting the result; rows without a value go last
+            ranked = self.ranges[sort_by].order
+            ranked = ranked if ascending else ranked[::-1]
+            selected = np.zeros(len(self.df), dtype=bool)
+            selected[rows] = True
+            unranked = np.setdiff1d(rows, ranked, assume_unique=True)
+            rows = np.concatenate([ranked[selected[ranked]], unranked])
+        if limit is not None:
+            rows = rows[:limit]
+        return self.df.iloc[rows][list(columns)].reset_index(drop=True)
+
+    def query(self, columns=DISPLAY_COLUMNS, sort_by='imdb_score', ascending=False, limit=None, **filters):
+        return self.take(self.match(**filters), columns, sort_by, ascending, limit)
+
+
+def movie_index():
+    """The index of the current metadata file, built once per process and file version."""
+    global _index
+    version = os.stat(METADATA_PATH).st_mtime_ns
+    with _lock:
+        if _index is None or _index[0] != version:
+            _index = (version, MovieIndex(read_metadata()))
+        return _index[1]
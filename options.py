@@ -0,0 +1,6 @@
+# Fixed option lists offered by the Input Form; every other page derives its categories from these
+DEAL_TYPES = ['imt', 'payments', 'issuance', 'vendor']
+REVIEW_TYPES = ['fresh_onboarding', 'periodic_review']
+ESCALATION_TYPES = ['other_red_flags', 'adverse_media', 'high_risk', 'pep_association', 'country_risk', 'complex_ownership', 'young_company', 'medium_risk', 'feedback_review']
+EDD_REVIEWERS = ['neelima_routhu', 'francis_xavier', 'rohan_vazapully', 'rahil_fw', 'moustapha', 'laura_castillo', 'hityshi']
+EDD_MEASURES = ['document_review', 'aml_review', 'audit_review', 'feedback_review']
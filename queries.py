@@ -0,0 +1,90 @@
+import pandas as pd
+from aggregation import COUNT_COLUMNS, aggregate_chunks
+from business_calendar import weekmask
+from frames import typed_frame
+import db
+
+# Columns the reviewer aggregation actually reads from the onboarding table
+AGGREGATION_COLUMNS = ['EDD_reviewer', 'escalation_type', 'EDD_measures']
+
+
+def _as_date(value):
+    return pd.Timestamp(value).date()
+
+
+def date_filter(start_date, end_date, skipped_dates=(), weekdays_only=True):
+    """Build the parameterized WHERE clause for a report period.
+
+    Returns the SQL fragment and its parameter list, to be used with %s placeholders.
+    """
+    clauses = ["completion_date BETWEEN %s AND %s"]
+    params = [_as_date(start_date), _as_date(end_date)]
+
+    skipped = sorted({_as_date(date) for date in skipped_dates})
+    if skipped:
+        clauses.append(f"completion_date NOT IN ({', '.join(['%s'] * len(skipped))})")
+        params.extend(skipped)
+
+    if weekdays_only:
+        # The configured working weekdays; MySQL's WEEKDAY() numbers Monday as 0, same as the weekmask
+        days = [day for day, working in enumerate(weekmask()) if working]
+        clauses.append(f"WEEKDAY(completion_date) IN ({', '.join(['%s'] * len(days))})")
+        params.extend(days)
+
+    return " AND ".join(clauses), params
+
+
+def fetch_onboarding(conn, start_date, end_date, skipped_dates=(), columns=AGGREGATION_COLUMNS):
+    """Fetch only the rows and columns of the report period from MySQL."""
+    where, params = date_filter(start_date, end_date, skipped_dates)
+    query = f"SELECT {', '.join(columns)} FROM onboarding WHERE {where}"
+    return typed_frame(db.read_sql(query, conn, params=params))
+
+
+def stream_onboarding(conn, start_date, end_date, skipped_dates=(), columns=AGGREGATION_COLUMNS, chunk_size=None):
+    """fetch_onboarding() as a stream of DataFrame chunks from an unbuffered cursor."""
+    where, params = date_filter(start_date, end_date, skipped_dates)
+    query = f"SELECT {', '.join(columns)} FROM onboarding WHERE {where}"
+    return (typed_frame(chunk) for chunk in db.iter_chunks(conn, query, params, chunk_size))
+
+
+def reviewer_breakdown_query(start_date, end_date, skipped_dates=(), table='onboarding', count='1'):
+    """One GROUP BY EDD_reviewer query returning the per-reviewer count columns.
+
+    The conditional SUM(CASE ...) columns are generated from aggregation.COUNT_COLUMNS, so they
+    follow the weights dict and option lists exactly like the pandas path. count is the SQL
+    expression each matching row contributes (entry_count for the daily rollup).
+    """
+    where, params = date_filter(start_date, end_date, skipped_dates)
+    sums = []
+    case_params = []
+    for name, source, category, _ in COUNT_COLUMNS:
+        sums.append(f"SUM(CASE WHEN {source} = %s THEN {count} ELSE 0 END) AS `{name}`")
+        case_params.append(category)
+    query = (
+        f"SELECT EDD_reviewer, {', '.join(sums)} FROM {table} "
+        f"WHERE {where} AND EDD_reviewer <> '' GROUP BY EDD_reviewer"
+    )
+    return query, case_params + params
+
+
+def fetch_reviewer_breakdown(conn, start_date, end_date, skipped_dates=(), table='onboarding', count='1'):
+    """Per-reviewer counts computed in MySQL; one row per reviewer comes back."""
+    query, params = reviewer_breakdown_query(start_date, end_date, skipped_dates, table, count)
+    agg_data = db.read_sql(query, conn, params=params)
+    count_names = [name for name, *_ in COUNT_COLUMNS]
+    # SUM() comes back as DECIMAL; sort in pandas so the order doesn't depend on the collation
+    agg_data[count_names] = agg_data[count_names].astype('int64')
+    return agg_data.sort_values('EDD_reviewer', ignore_index=True)
+
+
+def compare_breakdowns(conn, start_date, end_date, skipped_dates=(), table='onboarding', count='1'):
+    """Parity check of the MySQL GROUP BY mode against the pandas aggregation of the raw rows.
+
+    Returns the differing cells (empty when both paths agree).
+    """
+    pandas_data = aggregate_chunks(stream_onboarding(conn, start_date, end_date, skipped_dates))
+    sql_data = fetch_reviewer_breakdown(conn, start_date, end_date, skipped_dates, table, count)
+    if list(pandas_data['EDD_reviewer']) != list(sql_data['EDD_reviewer']):
+        return pd.DataFrame({'pandas': pandas_data['EDD_reviewer'], 'sql': sql_data['EDD_reviewer']})
+    return pandas_data.compare(sql_data, result_names=('pandas', 'sql'))
@@ -0,0 +1,213 @@
+"""Headless weekly SLA reports, written as CSV/Parquet/PDF artifacts.
+
+The report is computed the same way as the Transformed Data page (daily rollup or snapshot,
+per-reviewer aggregation, working hours, build_sla_table) but without Streamlit, so it can run
+from cron or as a long-lived daemon. The Report Scheduling page lists the artifacts.
+
+    REPORTS_DIR         artifact directory (default ./reports)
+    REPORT_SCHEDULE     daemon run time, "<weekday> HH:MM" (default "monday 06:00")
+
+    python report_engine.py run [--start 2024-03-04 --end 2024-03-08] [--format csv parquet pdf] [--snapshot]
+    python report_engine.py daemon
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+import pandas as pd
+import db
+import export
+import rollup
+import snapshot
+import styling
+from aggregation import aggregate_by_reviewer, build_sla_table
+from business_calendar import working_hours
+
+REPORTS_DIR = os.getenv("REPORTS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports"))
+SCHEDULE = os.getenv("REPORT_SCHEDULE", "monday 06:00")
+FORMATS = ['csv', 'parquet', 'pdf']
+
+# sla_<start>_<end>.<format>
+ARTIFACT_PATTERN = re.compile(r'^sla_(\d{4}-\d{2}-\d{2})_(\d{4}-\d{2}-\d{2})\.(csv|parquet|pdf)$')
+
+logger = logging.getLogger(__name__)
+
+
+def sla_report(start_date, end_date, skipped_dates=(), use_snapshot=False):
+    """The SLA table of a period: one row per reviewer plus the Total row."""
+    if use_snapshot:
+        df = snapshot.load_period(start_date, end_date, skipped_dates)
+    else:
+        with db.connection() as conn:
+            df = rollup.fetch_daily_counts(conn, start_date, end_date, skipped_dates)
+    agg_data = aggregate_by_reviewer(df, count_column='entry_count' if 'entry_count' in df.columns else None)
+    hours = working_hours(agg_data['EDD_reviewer'].to_numpy(), start_date, end_date, skipped_dates)
+    return build_sla_table(agg_data, hours)
+
+
+def last_week(today=None):
+    """Monday and Friday of the last full week before today."""
+    today = today or date.today()
+    monday = today - timedelta(days=today.weekday() + 7)
+    return monday, monday + timedelta(days=4)
+
+
+def artifact_path(start_date, end_date, file_format):
+    return os.path.join(REPORTS_DIR, f"sla_{start_date:%Y-%m-%d}_{end_date:%Y-%m-%d}.{file_format}")
+
+
+def _hex_to_rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def write_pdf(table, path, title):
+    """Render the SLA table on one landscape page with the same cell colors as the page."""
+    # PyFPDF 1.7 API (ln=, output(path, 'F'), core fonts), pinned in requirements.txt
+    from fpdf import FPDF
+
+    pdf = FPDF(orientation='L', unit='mm', format='A4')
+    pdf.set_auto_page_break(True, margin=10)
+    pdf.add_page()
+    pdf.set_font('Arial', 'B', 12)
+    pdf.cell(0, 8, title, ln=1)
+
+    first_width = 30
+    width = (pdf.w - 2 * pdf.l_margin - first_width) / max(len(table.columns) - 1, 1)
+    widths = [first_width] + [width] * (len(table.columns) - 1)
+
+    # Header, shrinking the font until each name fits its column
+    pdf.set_fill_color(*_hex_to_rgb(styling.HEADER_COLOR))
+    pdf.set_text_color(255, 255, 255)
+    for column, column_width in zip(table.columns, widths):
+        size = 7
+        pdf.set_font('Arial', 'B', size)
+        while size > 4 and pdf.get_string_width(column) > column_width - 1:
+            size -= 0.5
+            pdf.set_font('Arial', 'B', size)
+        pdf.cell(column_width, 8, column, border=1, align='C', fill=True)
+    pdf.ln()
+
+    pdf.set_font('Arial', '', 7)
+    pdf.set_text_color(0, 0, 0)
+    colors = styling.fill_colors(table)
+    for row, values in enumerate(table.itertuples(index=False, name=None)):
+        for col, (value, column_width) in enumerate(zip(values, widths)):
+            pdf.set_fill_color(*_hex_to_rgb(colors[col, row]))
+            pdf.cell(column_width, 6, str(value), border=1, align='C', fill=True)
+        pdf.ln()
+    pdf.output(path, 'F')
+
+
+def write_artifacts(table, start_date, end_date, formats=FORMATS):
+    """Write the report in every format into REPORTS_DIR; returns the paths written."""
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    paths = []
+    for file_format in formats:
+        if file_format == 'parquet' and not export.ARROW_AVAILABLE:
+            logger.warning("Skipping the Parquet artifact: pyarrow is not installed")
+            continue
+        path = artifact_path(start_date, end_date, file_format)
+        # Write next to the target and rename, so the page never lists a half-written file
+        tmp_path = path + ".tmp"
+        if file_format == 'csv':
+            table.to_csv(tmp_path, index=False)
+        elif file_format == 'parquet':
+            export.pq.write_table(export.pa.Table.from_pandas(table, preserve_index=False), tmp_path)
+        elif file_format == 'pdf':
+            write_pdf(table, tmp_path, f"Weekly SLA report {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}")
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+def run(start_date=None, end_date=None, skipped_dates=(), formats=FORMATS, use_snapshot=False):
+    """Compute one report (last week by default) and write its artifacts."""
+    if (start_date is None) != (end_date is None):
+        raise ValueError("give both start_date and end_date, or neither for last week")
+    if start_date is None:
+        start_date, end_date = last_week()
+    started = time.perf_counter()
+    table = sla_report(start_date, end_date, skipped_dates, use_snapshot)
+    paths = write_artifacts(table, start_date, end_date, formats)
+    logger.info("SLA report %s..%s written in %.2fs: %s", start_date, end_date, time.perf_counter() - started, ", ".join(paths))
+    return paths
+
+
+def list_artifacts():
+    """Artifacts in REPORTS_DIR, newest period first."""
+    records = []
+    if os.path.isdir(REPORTS_DIR):
+        for name in os.listdir(REPORTS_DIR):
+            match = ARTIFACT_PATTERN.match(name)
+            if not match:
+                continue
+            path = os.path.join(REPORTS_DIR, name)
+            stat = os.stat(path)
+            records.append({
+                'start_date': date.fromisoformat(match.group(1)),
+                'end_date': date.fromisoformat(match.group(2)),
+                'format': match.group(3),
+                'path': path,
+                'size_kb': round(stat.st_size / 1024, 1),
+                'written_at': datetime.fromtimestamp(stat.st_mtime).replace(microsecond=0),
+            })
+    columns = ['start_date', 'end_date', 'format', 'path', 'size_kb', 'written_at']
+    return pd.DataFrame(records, columns=columns).sort_values(['start_date', 'format'], ascending=[False, True], ignore_index=True)
+
+
+def load_artifact(path):
+    """The SLA table of a CSV or Parquet artifact."""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def daemon(at=SCHEDULE, formats=FORMATS, use_snapshot=False):
+    """Write last week's report every week at `at` ("<weekday> HH:MM"), forever."""
+    import schedule
+
+    weekday, clock = at.split()
+
+    def job():
+        try:
+            run(formats=formats, use_snapshot=use_snapshot)
+        except Exception:
+            # Keep the daemon alive; the next run retries
+            logger.exception("Scheduled SLA report failed")
+
+    getattr(schedule.every(), weekday.lower()).at(clock).do(job)
+    logger.info("Writing the weekly SLA report every %s at %s to %s", weekday, clock, REPORTS_DIR)
+    while True:
+        schedule.run_pending()
+        time.sleep(30)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Write the weekly SLA report as CSV/Parquet/PDF artifacts.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="write one report (last week by default)")
+    run_parser.add_argument("--start", type=date.fromisoformat)
+    run_parser.add_argument("--end", type=date.fromisoformat)
+    daemon_parser = subparsers.add_parser("daemon", help="write last week's report on a schedule")
+    daemon_parser.add_argument("--at", default=SCHEDULE, help='"<weekday> HH:MM" (default %(default)s)')
+    for subparser in (run_parser, daemon_parser):
+        subparser.add_argument("--format", nargs="+", choices=FORMATS, default=FORMATS)
+        subparser.add_argument("--snapshot", action="store_true", help="read the Parquet snapshot instead of MySQL")
+    args = parser.parse_args(argv)
+    if args.command == "run" and (args.start is None) != (args.end is None):
+        run_parser.error("--start and --end go together; leave both out for last week")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.command == "run":
+        for path in run(args.start, args.end, formats=args.format, use_snapshot=args.snapshot):
+            print(path)
+    else:
+        daemon(args.at, args.format, args.snapshot)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,7 +1,67 @@
 import streamlit as st 
 import pandas as pd
 import plotly.express as px 
+import mysql.connector
+import os
+import report_engine
+
+MIME_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'pdf': 'application/pdf',
+}
 
 
 def show():
-    pass  # To be implemented
\ No newline at end of file
+    st.title("Report Scheduling")
+    st.subheader("Weekly SLA reports precomputed by the report engine")
+    st.caption(
+        f"Reports are written to {report_engine.REPORTS_DIR} by `python report_engine.py daemon` "
+        f"(every {report_engine.SCHEDULE}) or on demand below."
+    )
+
+    # On-demand run for any period
+    with st.expander("Generate a report now"):
+        default_start, default_end = report_engine.last_week()
+        start_date = st.date_input("Start date", value=default_start, key="report_start_date")
+        end_date = st.date_input("End date", value=default_end, key="report_end_date")
+        formats = st.multiselect("Formats", report_engine.FORMATS, default=report_engine.FORMATS)
+        if st.button("Generate"):
+            try:
+                with st.spinner("Writing the report..."):
+                    paths = report_engine.run(start_date, end_date, formats=formats)
+                st.success(f"Wrote {len(paths)} file(s).")
+            except mysql.connector.Error as err:
+                st.error(f"Error generating report: {err}")
+
+    artifacts = report_engine.list_artifacts()
+    if artifacts.empty:
+        st.write("No reports have been written yet.")
+        return
+
+    st.dataframe(artifacts.drop(columns=['path']), use_container_width=True)
+
+    # Opening a past report reads its artifact instead of recomputing it
+    periods = artifacts[['start_date', 'end_date']].drop_duplicates()
+    labels = [f"{start} to {end}" for start, end in periods.itertuples(index=False)]
+    selected = st.selectbox("Open report", range(len(labels)), format_func=lambda i: labels[i])
+    start_date, end_date = periods.iloc[selected]
+    report_files = artifacts[(artifacts['start_date'] == start_date) & (artifacts['end_date'] == end_date)]
+
+    tables = report_files[report_files['format'].isin(['parquet', 'csv'])]
+    if not tables.empty:
+        table = report_engine.load_artifact(tables['path'].iloc[0])
+        st.dataframe(table, use_container_width=True)
+        fig = px.bar(table.iloc[:-1], x='EDD_reviewer', y=['Total SLA period', 'Total Working Hours'], barmode='group', title="SLA period vs working hours by reviewer")
+        st.plotly_chart(fig)
+
+    cols = st.columns(len(report_files))
+    for col, (file_format, path) in zip(cols, report_files[['format', 'path']].itertuples(index=False)):
+        with col, open(path, 'rb') as f:
+            st.download_button(
+                label=f"Download {file_format.upper()}",
+                data=f.read(),
+                file_name=os.path.basename(path),
+                mime=MIME_TYPES[file_format],
+                key=f"download_{os.path.basename(path)}",
+            )
@@ -0,0 +1,188 @@
+"""Process-wide cache for onboarding query results.
+
+Entries are keyed by the query parameters and stamped with the table watermark
+(MAX(timestamp), COUNT(*)) at load time. A lookup only reuses an entry whose watermark still
+matches the current one, so unchanged data is never refetched and a new submission from the
+Input Form invalidates every entry on the next rerun.
+
+Results of closed periods (ending before today) are memoized with a lighter check: for
+PERIOD_MEMO_TTL seconds after a load (or a check) they are reused without any query, and after
+that the next lookup compares the watermark once. A write in this process drops the periods it
+touches right away; back-dated rows written elsewhere (bulk_import.py, another replica's
+write-behind worker) show up within the TTL.
+"""
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+import pandas as pd
+import db
+
+WATERMARK_QUERY = "SELECT MAX(timestamp), COUNT(*) FROM onboarding"
+
+
+def _copy(value):
+    # Hand out shallow copies so a page adding a column can't change the cached frame
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    if isinstance(value, tuple):
+        return tuple(_copy(item) for item in value)
+    return value
+
+
+class ResultCache:
+    """Size-bounded LRU cache of (watermark, value) entries with hit/miss counters."""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, watermark, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == watermark:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy(entry[1])
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            self._entries[key] = (watermark, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return _copy(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+
+class PeriodMemo:
+    """Size-bounded LRU memo of closed-period results, keyed by (start, end, key).
+
+    Entries are stamped with their watermark and are revalidated against it once ttl seconds
+    have passed since they were loaded or last checked.
+    """
+
+    def __init__(self, max_entries=256, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_load(self, start_date, end_date, key, watermark, loader):
+        """watermark() is only called for a miss or an entry past its ttl."""
+        full_key = (start_date, end_date, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return _copy(entry[2])
+
+        current = watermark()
+
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None and entry[1] == current:
+                self._entries[full_key] = (time.monotonic(), current, entry[2])
+                self._entries.move_to_end(full_key)
+                self.hits += 1
+                return _copy(entry[2])
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            # Stamped with the watermark read before loading, so a write in between forces a reload
+            self._entries[full_key] = (time.monotonic(), current, value)
+            self._entries.move_to_end(full_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return _copy(value)
+
+    def forget(self, dates):
+        """Drop every period that contains one of dates."""
+        dates = [_as_date(d) for d in dates]
+        with self._lock:
+            for full_key in [k for k in self._entries if any(k[0] <= d <= k[1] for d in dates)]:
+                del self._entries[full_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _as_date(value):
+    return pd.Timestamp(value).date()
+
+
+_cache = ResultCache(max_entries=int(os.environ.get("RESULT_CACHE_SIZE", 64)))
+_periods = PeriodMemo(
+    max_entries=int(os.environ.get("PERIOD_MEMO_SIZE", 256)),
+    ttl=float(os.environ.get("PERIOD_MEMO_TTL", 300)),
+)
+
+
+def watermark(conn):
+    db.count_query()
+    c = conn.cursor()
+    c.execute(WATERMARK_QUERY)
+    row = c.fetchone()
+    c.close()
+    return tuple(row)
+
+
+def cached(conn, key, loader):
+    """Return loader() for key, reusing the cached result while the onboarding watermark is unchanged."""
+    return _cache.get_or_load(key, watermark(conn), loader)
+
+
+def cached_period(start_date, end_date, key, loader):
+    """loader(conn) for a report period: memoized with a watermark check every PERIOD_MEMO_TTL
+    seconds once the period is closed, otherwise cached like cached(). A connection is only
+    checked out when needed."""
+    start_date, end_date = _as_date(start_date), _as_date(end_date)
+    if end_date < date.today():
+        with contextlib.ExitStack() as stack:
+            conns = []
+
+            def connect():
+                if not conns:
+                    conns.append(stack.enter_context(db.connection()))
+                return conns[0]
+            return _periods.get_or_load(start_date, end_date, key, lambda: watermark(connect()), lambda: loader(connect()))
+    with db.connection() as conn:
+        return cached(conn, (start_date, end_date, key), lambda: loader(conn))
+
+
+def forget_dates(dates):
+    """Invalidate memoized closed periods covering dates that were just written."""
+    _periods.forget(dates)
+
+
+def forget_all():
+    _periods.clear()
+
+
+def stats():
+    return _cache.stats()
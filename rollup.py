@@ -0,0 +1,172 @@
+"""Daily rollup of the onboarding table.
+
+One row per completion_date x EDD_reviewer x escalation_type x EDD_measures with the number of
+entries, kept up to date by input_form.insert_entry in the same transaction as the insert.
+escalation_count / measures_count count the entries whose value is not NULL (an empty string
+counts), since the '' sentinel of the key can't tell the two apart.
+
+Rebuild it from the raw table with:
+
+    python rollup.py backfill
+"""
+import sys
+import mysql.connector
+import queries
+import db
+import result_cache
+from frames import typed_frame
+
+ROLLUP_TABLE = "onboarding_daily_rollup"
+
+# NULL dimensions are stored as '' so they can be part of the primary key
+CREATE_ROLLUP_TABLE = f'''
+    CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+        completion_date DATE NOT NULL,
+        EDD_reviewer VARCHAR(255) NOT NULL DEFAULT '',
+        escalation_type VARCHAR(255) NOT NULL DEFAULT '',
+        EDD_measures VARCHAR(255) NOT NULL DEFAULT '',
+        entry_count INT NOT NULL,
+        escalation_count INT NOT NULL DEFAULT 0,
+        measures_count INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (completion_date, EDD_reviewer, escalation_type, EDD_measures)
+    )
+'''
+
+INCREMENT_QUERY = f'''
+    INSERT INTO {ROLLUP_TABLE} (completion_date, EDD_reviewer, escalation_type, EDD_measures, entry_count, escalation_count, measures_count)
+    VALUES (%s, %s, %s, %s, 1, %s, %s)
+    ON DUPLICATE KEY UPDATE entry_count = entry_count + 1,
+        escalation_count = escalation_count + VALUES(escalation_count),
+        measures_count = measures_count + VALUES(measures_count)
+'''
+
+# Recount rollup rows from the raw table for the completion dates matched by {where}
+RECOUNT_QUERY = f'''
+    INSERT INTO {ROLLUP_TABLE} (completion_date, EDD_reviewer, escalation_type, EDD_measures, entry_count, escalation_count, measures_count)
+    SELECT completion_date, COALESCE(EDD_reviewer, ''), COALESCE(escalation_type, ''), COALESCE(EDD_measures, ''),
+           COUNT(*), COUNT(escalation_type), COUNT(EDD_measures)
+    FROM onboarding
+    WHERE {{where}}
+    GROUP BY completion_date, COALESCE(EDD_reviewer, ''), COALESCE(escalation_type, ''), COALESCE(EDD_measures, '')
+'''
+
+BACKFILL_QUERY = RECOUNT_QUERY.format(where="completion_date IS NOT NULL")
+
+
+def increment(conn, completion_date, EDD_reviewer, escalation_type, EDD_measures):
+    """Count one new onboarding row; runs on the caller's connection so it shares its transaction."""
+    db.execute_prepared(conn, INCREMENT_QUERY, (
+        completion_date, EDD_reviewer or '', escalation_type or '', EDD_measures or '',
+        int(escalation_type is not None), int(EDD_measures is not None),
+    ))
+    if completion_date is not None:
+        result_cache.forget_dates([completion_date])
+
+
+def backfill(conn):
+    """Rebuild the whole rollup from the raw onboarding table in one transaction."""
+    c = conn.cursor()
+    try:
+        c.execute(CREATE_ROLLUP_TABLE)
+        conn.start_transaction()
+        c.execute(f"DELETE FROM {ROLLUP_TABLE}")
+        c.execute(BACKFILL_QUERY)
+        conn.commit()
+        result_cache.forget_all()
+        return c.rowcount
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        c.close()
+
+
+def refresh_dates(cursor, dates):
+    """Recount the rollup rows of the given completion dates from the raw table.
+
+    Used by bulk writers: unlike increment() it stays correct when some rows were skipped
+    as duplicates, and it is safe to repeat.
+    """
+    dates = sorted(set(dates))
+    if not dates:
+        return
+    placeholders = ', '.join(['%s'] * len(dates))
+    cursor.execute(f"DELETE FROM {ROLLUP_TABLE} WHERE completion_date IN ({placeholders})", dates)
+    cursor.execute(RECOUNT_QUERY.format(where=f"completion_date IN ({placeholders})"), dates)
+    result_cache.forget_dates(dates)
+
+
+def fetch_daily_counts(conn, start_date, end_date, skipped_dates=()):
+    """Rollup rows of the report period, to be aggregated with count_column='entry_count'."""
+    where, params = queries.date_filter(start_date, end_date, skipped_dates)
+    query = (
+        f"SELECT completion_date, EDD_reviewer, escalation_type, EDD_measures, entry_count FROM {ROLLUP_TABLE} "
+        f"WHERE {where} AND EDD_reviewer <> ''"
+    )
+    return typed_frame(db.read_sql(query, conn, params=params))
+
+
+def fetch_reviewer_breakdown(conn, start_date, end_date, skipped_dates=()):
+    """The MySQL GROUP BY reviewer breakdown, summed from the rollup instead of the raw rows."""
+    return queries.fetch_reviewer_breakdown(conn, start_date, end_date, skipped_dates, ROLLUP_TABLE, 'entry_count')
+
+
+def compare_breakdowns(conn, start_date, end_date, skipped_dates=()):
+    """Parity of the rollup breakdown against the pandas aggregation of the raw rows."""
+    return queries.compare_breakdowns(conn, start_date, end_date, skipped_dates, ROLLUP_TABLE, 'entry_count')
+
+
+def fetch_reviewer_totals(conn):
+    """Non-NULL escalation_type / EDD_measures counts per reviewer over the whole history.
+
+    Rows without a completion_date have no rollup row and are counted from the raw table
+    (through its completion_date index).
+    """
+    query = f'''
+        SELECT EDD_reviewer, SUM(escalation_type) AS escalation_type, SUM(EDD_measures) AS EDD_measures
+        FROM (
+            SELECT EDD_reviewer, SUM(escalation_count) AS escalation_type, SUM(measures_count) AS EDD_measures
+            FROM {ROLLUP_TABLE}
+            WHERE EDD_reviewer <> ''
+            GROUP BY EDD_reviewer
+            UNION ALL
+            SELECT EDD_reviewer, COUNT(escalation_type), COUNT(EDD_measures)
+            FROM onboarding
+            WHERE completion_date IS NULL AND EDD_reviewer <> ''
+            GROUP BY EDD_reviewer
+        ) totals
+        GROUP BY EDD_reviewer
+        ORDER BY EDD_reviewer
+    '''
+    df = db.read_sql(query, conn)
+    return df.astype({'escalation_type': 'int64', 'EDD_measures': 'int64'})
+
+
+def fetch_monthly_totals(conn):
+    """Non-NULL escalation_type / EDD_measures counts per completion month (YYYY-MM).
+
+    Rows without a completion_date have no month and are left out.
+    """
+    query = f'''
+        SELECT DATE_FORMAT(completion_date, '%Y-%m') AS completion_month,
+               SUM(escalation_count) AS escalation_type, SUM(measures_count) AS EDD_measures
+        FROM {ROLLUP_TABLE}
+        GROUP BY completion_month
+        ORDER BY completion_month
+    '''
+    df = db.read_sql(query, conn)
+    return df.astype({'escalation_type': 'int64', 'EDD_measures': 'int64'})
+
+
+def main(argv):
+    if argv != ['backfill']:
+        print("usage: python rollup.py backfill")
+        return 2
+    with db.connection() as conn:
+        rows = backfill(conn)
+    print(f"Rebuilt {ROLLUP_TABLE}: {rows} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,129 @@
+"""On-disk Parquet snapshot of the onboarding table.
+
+The snapshot is written from the streaming fetch, one row group per chunk, and carries the table
+watermark it was taken at. Report pages can read a date range from it (row groups outside the
+range are skipped via their statistics) instead of querying MySQL.
+
+    SNAPSHOT_PATH   snapshot file (default ./data/onboarding.parquet)
+
+    python snapshot.py refresh
+"""
+import json
+import os
+import shutil
+import sys
+import threading
+from datetime import datetime
+import pandas as pd
+import db
+import export
+import result_cache
+from frames import typed_frame
+from business_calendar import working_days
+
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "onboarding.parquet"))
+
+# Option-list columns are read straight from the Parquet dictionaries, then mapped to the fixed categories
+DICTIONARY_COLUMNS = ['deal_type', 'review_type', 'escalation_type', 'EDD_reviewer', 'EDD_measures']
+
+if export.ARROW_AVAILABLE:
+    pa, pq = export.pa, export.pq
+    ONBOARDING_SCHEMA = pa.schema([
+        ('id', pa.string()),
+        ('completion_date', pa.date32()),
+        ('partner_name', pa.string()),
+        ('deal_type', pa.string()),
+        ('review_type', pa.string()),
+        ('escalation_type', pa.string()),
+        ('EDD_reviewer', pa.string()),
+        ('EDD_measures', pa.string()),
+        ('timestamp', pa.timestamp('us')),
+    ])
+else:
+    ONBOARDING_SCHEMA = None
+
+# Memoized load() results per (file version, filters, columns)
+MAX_LOADED = 16
+_lock = threading.Lock()
+_loaded = {}
+
+
+def available():
+    return export.ARROW_AVAILABLE and os.path.exists(SNAPSHOT_PATH)
+
+
+def refresh(chunk_size=None, progress=None):
+    """Rewrite the snapshot from MySQL; returns its info()."""
+    with db.connection() as conn:
+        max_timestamp, row_count = result_cache.watermark(conn)
+        metadata = {
+            'watermark': json.dumps([str(max_timestamp), row_count]),
+            'taken_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        path = export.write_parquet(
+            db.iter_chunks(conn, "SELECT * FROM onboarding", chunk_size=chunk_size),
+            schema=ONBOARDING_SCHEMA, progress=progress, metadata=metadata,
+        )
+    # Move next to the target first so the final replace is atomic for concurrent readers
+    os.makedirs(os.path.dirname(SNAPSHOT_PATH), exist_ok=True)
+    shutil.move(path, SNAPSHOT_PATH + ".tmp")
+    os.replace(SNAPSHOT_PATH + ".tmp", SNAPSHOT_PATH)
+    return info()
+
+
+def info():
+    """Row count, watermark and time of the current snapshot."""
+    parquet_file = pq.ParquetFile(SNAPSHOT_PATH)
+    metadata = {key.decode(): value.decode() for key, value in (parquet_file.schema_arrow.metadata or {}).items()}
+    return {
+        'rows': parquet_file.metadata.num_rows,
+        'row_groups': parquet_file.metadata.num_row_groups,
+        'watermark': json.loads(metadata.get('watermark', 'null')),
+        'taken_at': metadata.get('taken_at'),
+    }
+
+
+def load(start_date=None, end_date=None, columns=None):
+    """The snapshot (optionally only completion dates in [start_date, end_date]) as a DataFrame.
+
+    Results are memoized per file version, so repeated reruns don't re-read the file.
+    """
+    filters = []
+    if start_date is not None:
+        filters.append(('completion_date', '>=', pd.Timestamp(start_date).date()))
+    if end_date is not None:
+        filters.append(('completion_date', '<=', pd.Timestamp(end_date).date()))
+    key = (os.stat(SNAPSHOT_PATH).st_mtime_ns, tuple(filters), tuple(columns or ()))
+
+    with _lock:
+        if key not in _loaded:
+            table = pq.read_table(
+                SNAPSHOT_PATH, columns=columns, filters=filters or None,
+                read_dictionary=[col for col in DICTIONARY_COLUMNS if columns is None or col in columns],
+            )
+            # A newer file version makes every older entry unreachable
+            if any(k[0] != key[0] for k in _loaded) or len(_loaded) >= MAX_LOADED:
+                _loaded.clear()
+            _loaded[key] = typed_frame(table.to_pandas())
+        return _loaded[key].copy(deep=False)
+
+
+def load_period(start_date, end_date, skipped_dates=()):
+    """Snapshot rows on the working days of the period, i.e. the rows fetch_onboarding() returns."""
+    df = load(start_date, end_date)
+    days = working_days(start_date, end_date, skipped_dates)
+    return df[df['completion_date'].isin(days)].reset_index(drop=True)
+
+
+def main(argv):
+    if argv != ["refresh"]:
+        print("usage: python snapshot.py refresh")
+        return 2
+    result = refresh(progress=lambda rows: print(f"\r{rows} rows", end="", flush=True))
+    print()
+    print(f"Snapshot of {result['rows']} rows in {result['row_groups']} row groups written to {SNAPSHOT_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,38 @@
+"""Cell fill colors of the transformed-data (SLA) table.
+
+Colors are decided per column class and broadcast down the rows, with the Total row
+overriding the identity columns, so the cost grows with the number of columns rather than
+with rows x columns of Python calls. The same arrays feed go.Table and the Excel export.
+"""
+import numpy as np
+
+IDENTITY_COLUMNS = ['EDD_reviewer', 'Total']
+SLA_COLUMNS = ['Total Working Hours', 'Total SLA period', 'Difference']
+
+CLASS_COLORS = {
+    'identity': '#FFFFE0',  # Light yellow
+    'sla': '#E6E6FA',       # Lavender
+    'counts': '#FFFFFF',    # White
+}
+TOTAL_ROW_COLOR = '#FFD700'  # Light gold
+HEADER_COLOR = '#4CAF50'
+
+
+def column_class(column):
+    if column in IDENTITY_COLUMNS:
+        return 'identity'
+    if column in SLA_COLUMNS:
+        return 'sla'
+    return 'counts'
+
+
+def fill_colors(df):
+    """Fill color of every cell as a (columns x rows) array, the layout go.Table expects."""
+    classes = [column_class(col) for col in df.columns]
+    colors = np.array([CLASS_COLORS[cls] for cls in classes], dtype=object)[:, None].repeat(len(df), axis=1)
+
+    if 'EDD_reviewer' in df.columns:
+        total_rows = (df['EDD_reviewer'] == 'Total').to_numpy()
+        identity = np.array([cls == 'identity' for cls in classes])
+        colors[np.ix_(identity, total_rows)] = TOTAL_ROW_COLOR
+    return colors
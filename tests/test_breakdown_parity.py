@@ -0,0 +1,105 @@
+"""Parity of the reviewer breakdown paths: the vectorized pandas aggregation, the original
+per-lambda groupby and the SQL GROUP BY mode (run on sqlite)."""
+import sqlite3
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from aggregation import COUNT_COLUMNS, aggregate_by_reviewer
+from frames import typed_frame
+from options import EDD_REVIEWERS, ESCALATION_TYPES, EDD_MEASURES
+from queries import reviewer_breakdown_query
+
+COUNT_NAMES = [name for name, *_ in COUNT_COLUMNS]
+START, END = date(2024, 3, 4), date(2024, 3, 15)
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(7)
+    n = 500
+    df = pd.DataFrame({
+        'completion_date': [START + timedelta(days=int(d)) for d in rng.integers(0, 12, n)],
+        'EDD_reviewer': rng.choice(EDD_REVIEWERS, n).astype(object),
+        'escalation_type': rng.choice(ESCALATION_TYPES + ['unlisted'], n).astype(object),
+        'EDD_measures': rng.choice(EDD_MEASURES, n).astype(object),
+    })
+    # Missing values the reports have to skip
+    df.loc[rng.random(n) < 0.05, 'escalation_type'] = None
+    df.loc[rng.random(n) < 0.05, 'EDD_measures'] = None
+    df.loc[rng.random(n) < 0.02, 'EDD_reviewer'] = None
+    return df
+
+
+def lambda_groupby(df):
+    """The per-lambda groupby the report used before the vectorized aggregation."""
+    return df.groupby('EDD_reviewer').agg(
+        other_red_flags=('escalation_type', lambda x: (x == 'other_red_flags').sum()),
+        adverse_media=('escalation_type', lambda x: (x == 'adverse_media').sum()),
+        high_risk=('escalation_type', lambda x: (x == 'high_risk').sum()),
+        pep_association=('escalation_type', lambda x: (x == 'pep_association').sum()),
+        country_risk=('escalation_type', lambda x: (x == 'country_risk').sum()),
+        complex_ownership=('escalation_type', lambda x: (x == 'complex_ownership').sum()),
+        young_company=('escalation_type', lambda x: (x == 'young_company').sum()),
+        medium_risk=('escalation_type', lambda x: (x == 'medium_risk').sum()),
+        feedback_review_esc=('escalation_type', lambda x: (x == 'feedback_review').sum()),
+        document_review=('EDD_measures', lambda x: (x == 'document_review').sum()),
+        aml_review=('EDD_measures', lambda x: (x == 'aml_review').sum()),
+        audit_review=('EDD_measures', lambda x: (x == 'audit_review').sum()),
+        feedback_review_meas=('EDD_measures', lambda x: (x == 'feedback_review').sum())
+    ).reset_index()
+
+
+def normalized(df):
+    df = df.astype({'EDD_reviewer': object}).astype({name: 'int64' for name in COUNT_NAMES})
+    return df.sort_values('EDD_reviewer', ignore_index=True)
+
+
+def weekdays(df):
+    return df[pd.to_datetime(df['completion_date']).dt.dayofweek < 5]
+
+
+def run_on_sqlite(df, query, params):
+    conn = sqlite3.connect(':memory:')
+    conn.create_function('WEEKDAY', 1, lambda value: date.fromisoformat(value).weekday())
+    df.assign(completion_date=df['completion_date'].astype(str)).to_sql('onboarding', conn, index=False)
+    # MySQL placeholders and dates to sqlite's
+    result = pd.read_sql(query.replace('%s', '?'), conn, params=[str(p) if isinstance(p, date) else p for p in params])
+    conn.close()
+    return result
+
+
+def test_count_columns_follow_the_old_report_columns(rows):
+    assert COUNT_NAMES == list(lambda_groupby(rows).columns[1:])
+
+
+@pytest.mark.parametrize('typed', [False, True])
+def test_aggregate_by_reviewer_matches_lambda_groupby(rows, typed):
+    data = typed_frame(rows) if typed else rows
+    expected = normalized(lambda_groupby(rows))
+    pd.testing.assert_frame_equal(normalized(aggregate_by_reviewer(data)), expected)
+
+
+def test_weighted_rows_match_repeated_rows(rows):
+    counted = rows.groupby(list(rows.columns), dropna=False).size().rename('entry_count').reset_index()
+    pd.testing.assert_frame_equal(
+        normalized(aggregate_by_reviewer(counted, count_column='entry_count')),
+        normalized(aggregate_by_reviewer(rows)),
+    )
+
+
+def test_sql_query_columns_match_count_columns():
+    query, params = reviewer_breakdown_query(START, END)
+    for name, source, category, _ in COUNT_COLUMNS:
+        assert f"SUM(CASE WHEN {source} = %s THEN 1 ELSE 0 END) AS `{name}`" in query
+    assert params[:len(COUNT_COLUMNS)] == [category for _, _, category, _ in COUNT_COLUMNS]
+    assert query.count('%s') == len(params)
+
+
+def test_sql_mode_matches_pandas(rows):
+    query, params = reviewer_breakdown_query(START, END, skipped_dates=[date(2024, 3, 6)])
+    sql_data = run_on_sqlite(rows, query, params)
+
+    kept = weekdays(rows[rows['completion_date'] != date(2024, 3, 6)])
+    pd.testing.assert_frame_equal(normalized(sql_data), normalized(aggregate_by_reviewer(kept)))
+    assert list(sql_data.columns) == ['EDD_reviewer'] + COUNT_NAMES
@@ -0,0 +1,24 @@
+from datetime import date
+import pandas as pd
+import bulk_import
+
+
+def test_unparseable_completion_dates_are_reported():
+    chunk = pd.DataFrame({
+        'id': ['a', 'b', 'c', 'd'],
+        'completion_date': ['2024-03-04', '05-03-2024', None, 'next tuesday'],
+        'EDD_reviewer': ['alice'] * 4,
+        'timestamp': ['2024-03-04 10:00:00'] * 4,
+    })
+    rows, unparseable = bulk_import.normalize_chunk(chunk)
+
+    dates = [row[bulk_import.COLUMNS.index('completion_date')] for row in rows]
+    assert dates == [date(2024, 3, 4), date(2024, 3, 5), None, None]
+    # An empty cell is not an error; a value that can't be read is
+    assert unparseable == ['next tuesday']
+
+
+def test_unparseable_warning():
+    assert bulk_import.unparseable_warning({'unparseable_dates': 0, 'unparseable_examples': []}) is None
+    warning = bulk_import.unparseable_warning({'unparseable_dates': 3, 'unparseable_examples': ['31-02-2024', 'tbd']})
+    assert warning.startswith("3 rows had a completion_date that could not be parsed (e.g. '31-02-2024', 'tbd')")
@@ -0,0 +1,40 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+import business_calendar
+import queries
+from aggregation import COUNT_COLUMNS, build_sla_table
+
+START, END = date(2024, 3, 3), date(2024, 3, 9)  # Sunday to Saturday
+
+
+@pytest.fixture
+def sunday_to_thursday(monkeypatch):
+    monkeypatch.setattr(business_calendar, 'config', lambda: {'weekmask': '1111001', 'hours_per_day': 8})
+
+
+def test_working_days_follow_the_configured_weekmask(sunday_to_thursday):
+    days = business_calendar.working_days(START, END)
+    assert [day.date() for day in days] == [date(2024, 3, d) for d in (3, 4, 5, 6, 7)]
+    assert business_calendar.working_hours(None, START, END) == 5 * 8
+
+
+def test_date_filter_uses_the_same_weekdays(sunday_to_thursday):
+    where, params = queries.date_filter(START, END)
+    assert "WEEKDAY(completion_date) IN (%s, %s, %s, %s, %s)" in where
+    assert params[2:] == [0, 1, 2, 3, 6]
+    assert where.count('%s') == len(params)
+
+
+def test_sla_total_row_sums_the_reviewers_hours():
+    agg_data = pd.DataFrame({'EDD_reviewer': ['alice', 'bob']})
+    for i, (name, *_) in enumerate(COUNT_COLUMNS):
+        agg_data[name] = [i, 2 * i]
+    table = build_sla_table(agg_data, np.array([40, 32]))
+
+    total = table.set_index('EDD_reviewer').loc['Total']
+    # Reviewers' hours differ (leave, holidays), so the Total row adds them up
+    assert total['Total Working Hours'] == 72
+    assert total['Difference'] == 72 - total['Total SLA period']
+    assert list(table['Total Working Hours']) == [40, 32, 72]
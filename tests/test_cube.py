@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+from cube import Cube
+from options import DEAL_TYPES, EDD_REVIEWERS, ESCALATION_TYPES, EDD_MEASURES, REVIEW_TYPES
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(11)
+    n = 300
+    return pd.DataFrame({
+        'completion_date': pd.to_datetime('2024-01-01') + pd.to_timedelta(rng.integers(0, 90, n), unit='D'),
+        'deal_type': rng.choice(DEAL_TYPES, n).astype(object),
+        'review_type': rng.choice(REVIEW_TYPES, n).astype(object),
+        'escalation_type': rng.choice(ESCALATION_TYPES, n).astype(object),
+        'EDD_reviewer': rng.choice(EDD_REVIEWERS, n).astype(object),
+        'EDD_measures': rng.choice(EDD_MEASURES, n).astype(object),
+    })
+
+
+@pytest.mark.parametrize('by', [
+    ['deal_type', 'EDD_reviewer'],
+    ['EDD_reviewer', 'deal_type'],
+    ['EDD_measures', 'month', 'review_type'],
+])
+def test_totals_follow_the_order_of_by(rows, by):
+    cube = Cube()
+    cube.add(rows)
+    filters = {'EDD_reviewer': [EDD_REVIEWERS[2], EDD_REVIEWERS[0]]}
+    totals = cube.totals(by, filters)
+
+    df = rows[rows['EDD_reviewer'].isin(filters['EDD_reviewer'])].assign(month=rows['completion_date'].dt.to_period('M').astype(str))
+    expected = df.groupby(by).size()
+    assert list(totals.index.names) == by
+    pd.testing.assert_series_equal(totals[totals > 0].sort_index(), expected.sort_index(), check_names=False, check_dtype=False)
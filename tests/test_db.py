@@ -0,0 +1,53 @@
+from collections import OrderedDict
+import pytest
+import db
+
+
+class FakeConnection:
+    def __init__(self, connection_id):
+        self.connection_id = connection_id
+        self.prepared = 0
+
+    def cursor(self, prepared=False):
+        self.prepared += prepared
+        return FakeCursor()
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def execute(self, query, params):
+        pass
+
+
+class FakePool:
+    def __init__(self, ids):
+        self.ids = iter(ids)
+
+    def get_connection(self):
+        return FakeConnection(next(self.ids))
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(db, 'POOL_SIZE', 2)
+    monkeypatch.setattr(db, '_prepared', OrderedDict())
+    monkeypatch.setattr(db, '_metrics', dict(db._metrics, reconnects=0))
+
+    def use(ids):
+        fake = FakePool(ids)
+        monkeypatch.setattr(db, 'get_pool', lambda: fake)
+    return use
+
+
+def test_prepared_statements_are_kept_per_session(pool):
+    # Sessions 1 and 2 are the pool's; 3 reopens session 2 after it dropped
+    pool([1, 2, 1, 3])
+    for expected_prepares in (1, 1, 0, 1):
+        with db.connection() as conn:
+            db.execute_prepared(conn, "SELECT 1", ())
+            db.execute_prepared(conn, "SELECT 1", ())
+            assert conn.prepared == expected_prepares
+    assert list(db._prepared) == [1, 3]
+    assert db.pool_stats()['reconnects'] == 1
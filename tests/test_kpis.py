@@ -0,0 +1,39 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+import kpis
+import result_cache
+from aggregation import build_sla_table
+
+REVIEWERS = ['alice', 'bob']
+
+
+@pytest.fixture
+def rows():
+    """Daily rollup counts: every reviewer logs (day of month) adverse_media entries per day."""
+    days = pd.date_range('2024-02-01', '2024-03-31', freq='D')
+    return pd.DataFrame({
+        'completion_date': np.repeat(days, len(REVIEWERS)),
+        'EDD_reviewer': REVIEWERS * len(days),
+        'escalation_type': 'adverse_media',
+        'EDD_measures': None,
+        'entry_count': np.repeat(days.day, len(REVIEWERS)),
+    })
+
+
+def test_period_deltas_from_rows_read_nothing(rows, monkeypatch):
+    def no_query(*args, **kwargs):
+        raise AssertionError("the comparison periods should come from rows")
+    monkeypatch.setattr(result_cache, 'cached_period', no_query)
+
+    start, end = date(2024, 3, 11), date(2024, 3, 15)
+    assert kpis.comparison_start(start) == date(2024, 2, 11)
+    current = build_sla_table(kpis.aggregate_by_reviewer(rows[rows['completion_date'].between('2024-03-11', '2024-03-15')], count_column='entry_count'), 40)
+    deltas = kpis.period_deltas(current, start, end, rows=rows[rows['completion_date'] >= '2024-02-11'])
+
+    # WoW: Mar 4-8; MoM: Feb 11-15, of which Feb 12-15 are weekdays
+    assert deltas.at['alice', 'Current'] == 11 + 12 + 13 + 14 + 15
+    assert deltas.at['alice', 'WoW Previous'] == 4 + 5 + 6 + 7 + 8
+    assert deltas.at['alice', 'MoM Previous'] == 12 + 13 + 14 + 15
+    assert deltas.at['Total', 'WoW Change'] == 2 * 35
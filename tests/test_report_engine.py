@@ -0,0 +1,25 @@
+from datetime import date
+import pandas as pd
+import pytest
+import report_engine
+from aggregation import COUNT_COLUMNS, build_sla_table
+
+
+def test_start_without_end_is_an_error(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        report_engine.main(["run", "--start", "2024-03-04"])
+    assert exit_info.value.code == 2
+    assert "--start and --end go together" in capsys.readouterr().err
+
+    with pytest.raises(ValueError):
+        report_engine.run(end_date=date(2024, 3, 8))
+
+
+def test_write_pdf(tmp_path):
+    agg_data = pd.DataFrame({'EDD_reviewer': ['alice', 'bob']})
+    for i, (name, *_) in enumerate(COUNT_COLUMNS):
+        agg_data[name] = [i, i + 1]
+    path = str(tmp_path / "report.pdf")
+    report_engine.write_pdf(build_sla_table(agg_data, 40), path, "Weekly SLA report")
+    with open(path, 'rb') as f:
+        assert f.read(4) == b'%PDF'
@@ -0,0 +1,42 @@
+from datetime import date
+import result_cache
+
+START, END = date(2024, 3, 4), date(2024, 3, 8)
+
+
+def test_period_memo_revalidates_against_the_watermark_after_ttl():
+    memo = result_cache.PeriodMemo(ttl=0)
+    current = [(1, 10)]
+    loads = []
+
+    def load():
+        loads.append(current[0])
+        return len(loads)
+
+    assert memo.get_or_load(START, END, 'k', lambda: current[0], load) == 1
+    # Same watermark: the entry is reused
+    assert memo.get_or_load(START, END, 'k', lambda: current[0], load) == 1
+    # A back-dated row written by another process moves the watermark
+    current[0] = (1, 11)
+    assert memo.get_or_load(START, END, 'k', lambda: current[0], load) == 2
+    assert loads == [(1, 10), (1, 11)]
+
+
+def test_period_memo_skips_the_watermark_within_ttl():
+    memo = result_cache.PeriodMemo(ttl=3600)
+    checks = []
+
+    def watermark():
+        checks.append(1)
+        return (1, 10)
+
+    memo.get_or_load(START, END, 'k', watermark, lambda: 'value')
+    assert memo.get_or_load(START, END, 'k', watermark, lambda: 'reloaded') == 'value'
+    assert len(checks) == 1
+
+
+def test_period_memo_forget_drops_periods_holding_the_dates():
+    memo = result_cache.PeriodMemo(ttl=3600)
+    memo.get_or_load(START, END, 'k', lambda: (1, 10), lambda: 'old')
+    memo.forget([date(2024, 3, 6)])
+    assert memo.get_or_load(START, END, 'k', lambda: (1, 10), lambda: 'new') == 'new'
@@ -0,0 +1,53 @@
+"""The Download page totals from the daily rollup against the pandas count() of the raw rows
+they replaced, on sqlite."""
+import sqlite3
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+import rollup
+from options import EDD_REVIEWERS, ESCALATION_TYPES, EDD_MEASURES
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(3)
+    n = 400
+    df = pd.DataFrame({
+        'completion_date': [str(date(2024, 1, 1) + timedelta(days=int(d))) for d in rng.integers(0, 90, n)],
+        'EDD_reviewer': rng.choice(EDD_REVIEWERS, n).astype(object),
+        'escalation_type': rng.choice(ESCALATION_TYPES, n).astype(object),
+        'EDD_measures': rng.choice(EDD_MEASURES, n).astype(object),
+    })
+    # NULLs and empty strings, which count() tells apart, and undated rows
+    df.loc[rng.random(n) < 0.1, 'escalation_type'] = None
+    df.loc[rng.random(n) < 0.1, 'escalation_type'] = ''
+    df.loc[rng.random(n) < 0.1, 'EDD_measures'] = None
+    df.loc[rng.random(n) < 0.1, 'EDD_measures'] = ''
+    df.loc[rng.random(n) < 0.05, 'completion_date'] = None
+    df.loc[rng.random(n) < 0.02, 'EDD_reviewer'] = None
+    return df
+
+
+@pytest.fixture
+def conn(rows):
+    conn = sqlite3.connect(':memory:')
+    conn.create_function('DATE_FORMAT', 2, lambda value, fmt: value[:7])
+    rows.to_sql('onboarding', conn, index=False)
+    conn.execute(rollup.CREATE_ROLLUP_TABLE)
+    conn.execute(rollup.BACKFILL_QUERY)
+    yield conn
+    conn.close()
+
+
+def test_reviewer_totals_match_count(conn, rows):
+    expected = rows.groupby('EDD_reviewer').agg({'escalation_type': 'count', 'EDD_measures': 'count'}).reset_index()
+    pd.testing.assert_frame_equal(rollup.fetch_reviewer_totals(conn), expected)
+
+
+def test_monthly_totals_match_count(conn, rows):
+    # Undated rows have no month
+    df = rows.dropna(subset=['completion_date']).copy()
+    df['completion_month'] = pd.to_datetime(df['completion_date']).dt.to_period('M').astype(str)
+    expected = df.groupby('completion_month').agg({'escalation_type': 'count', 'EDD_measures': 'count'}).reset_index()
+    pd.testing.assert_frame_equal(rollup.fetch_monthly_totals(conn), expected)
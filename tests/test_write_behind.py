@@ -0,0 +1,70 @@
+import json
+import mysql.connector
+import pytest
+import write_behind
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    for name, filename in (('JOURNAL_PATH', 'write_behind.jsonl'), ('OFFSET_PATH', 'write_behind.offset'), ('DEAD_LETTER_PATH', 'write_behind.dead.jsonl')):
+        monkeypatch.setattr(write_behind, name, str(tmp_path / filename))
+    monkeypatch.setattr(write_behind, 'QUEUE_DIR', str(tmp_path))
+    monkeypatch.setattr(write_behind, 'start_worker', lambda: None)
+    monkeypatch.setattr(write_behind, '_failures', {})
+    return tmp_path
+
+
+def submit(entry_id):
+    write_behind.enqueue(entry_id, '2024-03-04', 'partner', 'deal', 'review', None, 'alice', None, '2024-03-04 10:00:00')
+
+
+def dead_letters(journal):
+    with open(journal / 'write_behind.dead.jsonl') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_failing_record_is_dead_lettered_after_max_attempts(journal, monkeypatch):
+    written = []
+
+    def insert(rows):
+        if any(row[0] == 'bad' for row in rows):
+            raise mysql.connector.errors.DataError(msg="Data too long for column 'partner_name'")
+        written.extend(row[0] for row in rows)
+    monkeypatch.setattr(write_behind, '_insert', insert)
+
+    for entry_id in ('a', 'bad', 'b'):
+        submit(entry_id)
+    with open(journal / 'write_behind.jsonl', 'a') as f:
+        f.write('{"id": "torn\n')
+    submit('c')
+
+    for _ in range(write_behind.MAX_ATTEMPTS - 1):
+        with pytest.raises(mysql.connector.Error):
+            write_behind.flush_once()
+    assert written == []
+
+    assert write_behind.flush_once() == 5
+    assert written == ['a', 'b', 'c']
+    errors = [letter['error'] for letter in dead_letters(journal)]
+    assert len(errors) == 2
+    assert errors[0].startswith('unreadable journal line')
+    assert 'Data too long' in errors[1]
+    assert write_behind.pending() == 0
+
+    # Later submissions are no longer held up
+    submit('d')
+    assert write_behind.flush_once() == 1
+    assert written[-1] == 'd'
+
+
+def test_lost_connection_is_never_dead_lettered(journal, monkeypatch):
+    def insert(rows):
+        raise mysql.connector.errors.InterfaceError(msg="Lost connection to MySQL server")
+    monkeypatch.setattr(write_behind, '_insert', insert)
+    submit('a')
+
+    for _ in range(write_behind.MAX_ATTEMPTS + 2):
+        with pytest.raises(mysql.connector.errors.InterfaceError):
+            write_behind.flush_once()
+    assert write_behind.pending() == 1
+    assert not (journal / 'write_behind.dead.jsonl').exists()
@@ -5,8 +5,16 @@ import plotly.express as px
 import plotly.graph_objects as go
 import mysql.connector
 from datetime import datetime
-import time
-from io import BytesIO
+from business_calendar import working_days, working_hours
+import rollup
+import db
+import result_cache
+import kpis
+import export
+import snapshot
+import styling
+from aggregation import aggregate_by_reviewer, build_sla_table
+from transformed_data_display import snapshot_toggle, kpi_change
 
 
 custom_css = """
@@ -111,90 +119,56 @@ h1, h2, h3, h4, h5, h6 {
 """
 st.markdown(custom_css, unsafe_allow_html=True)
 
-# Define weights for each escalation type and EDD measure
-weights = {
-    'other_red_flags': 1,
-    'adverse_media': 3,
-    'high_risk': 5,
-    'pep_association': 3,
-    'country_risk': 1,
-    'complex_ownership': 1,
-    'young_company': 1,
-    'medium_risk': 4,
-    'combined_reviews': 2  # Combined weight for document review, aml review, audit review, and feedback review
-}
+def fetch_period_rows(start_date, end_date, use_snapshot=False):
+    """Rows of every weekday in [start_date, end_date] in one read, to be split per week in memory."""
+    try:
+        if use_snapshot:
+            return snapshot.load_period(start_date, end_date)
+        with db.connection() as conn:
+            return result_cache.cached(conn, ('daily_counts', start_date, end_date, ()), lambda: rollup.fetch_daily_counts(conn, start_date, end_date))
+    except mysql.connector.Error as err:
+        st.error(f"Error fetching data: {err}")
+        return None
 
-def fetch_transformed_data(selected_dates):
+def fetch_transformed_data(start_date, end_date, skipped_dates=(), group_in_sql=False, use_snapshot=False, rows=None):
     try:
-        # Establish database connection
-        conn = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root',
-            database='TERRAPAY'
-        )
+        # Results are reused until the onboarding watermark moves
+        period = (start_date, end_date, tuple(sorted(skipped_dates)))
+        group_in_sql = group_in_sql and not use_snapshot and rows is None
+
+        if rows is not None:
+            # Split the rows fetched for the whole month in memory instead of querying again
+            df = rows[rows['completion_date'].isin(working_days(start_date, end_date, skipped_dates))]
+        elif use_snapshot:
+            # Raw rows of the selected working days from the Parquet snapshot, without querying MySQL
+            df = snapshot.load_period(start_date, end_date, skipped_dates)
+        else:
+            with db.connection() as conn:
+                if group_in_sql:
+                    # The whole reviewer breakdown runs as one GROUP BY in MySQL
+                    agg_data = result_cache.cached(conn, ('reviewer_breakdown',) + period, lambda: rollup.fetch_reviewer_breakdown(conn, start_date, end_date, skipped_dates))
+                else:
+                    # Fetch the daily rollup rows of the selected working days; the date filter runs in MySQL
+                    df = result_cache.cached(conn, ('daily_counts',) + period, lambda: rollup.fetch_daily_counts(conn, start_date, end_date, skipped_dates))
 
-        # Fetch data
-        query = "SELECT * FROM onboarding"
-        df = pd.read_sql(query, conn)
-        st.write("Fetched data from database:", df.head())
+        if not group_in_sql:
+            st.write("Fetched data from database:", df.head())
 
-        # Filter data based on selected dates
-        df = df[df['completion_date'].isin(selected_dates)]
-        st.write("Data after date filter:", df.head())
+            # Aggregating the counts of escalation types and EDD measures per reviewer
+            agg_data = aggregate_by_reviewer(df, count_column='entry_count' if 'entry_count' in df.columns else None)
 
-        if df.empty:
+        if agg_data.empty:
             st.warning("No data available for the selected dates.")
             return pd.DataFrame()
 
-        # Aggregating the counts of escalation types and EDD measures per reviewer
-        agg_data = df.groupby('EDD_reviewer').agg(
-            other_red_flags=('escalation_type', lambda x: (x == 'other_red_flags').sum()),
-            adverse_media=('escalation_type', lambda x: (x == 'adverse_media').sum()),
-            high_risk=('escalation_type', lambda x: (x == 'high_risk').sum()),
-            pep_association=('escalation_type', lambda x: (x == 'pep_association').sum()),
-            country_risk=('escalation_type', lambda x: (x == 'country_risk').sum()),
-            complex_ownership=('escalation_type', lambda x: (x == 'complex_ownership').sum()),
-            young_company=('escalation_type', lambda x: (x == 'young_company').sum()),
-            medium_risk=('escalation_type', lambda x: (x == 'medium_risk').sum()),
-            feedback_review_esc=('escalation_type', lambda x: (x == 'feedback_review').sum()),
-            document_review=('EDD_measures', lambda x: (x == 'document_review').sum()),
-            aml_review=('EDD_measures', lambda x: (x == 'aml_review').sum()),
-            audit_review=('EDD_measures', lambda x: (x == 'audit_review').sum()),
-            feedback_review_meas=('EDD_measures', lambda x: (x == 'feedback_review').sum())
-        ).reset_index()
-
         st.write("Aggregated data:", agg_data.head())
 
-        # Calculate totals for each row and column
-        agg_data['Total'] = agg_data.iloc[:, 1:].sum(axis=1)
-        total_row = pd.DataFrame(agg_data.sum(numeric_only=True)).transpose()
-        total_row['EDD_reviewer'] = 'Total'
-        agg_data = pd.concat([agg_data, total_row], ignore_index=True)
-        st.write("Data with totals:", agg_data.head())
-
-        # Calculate Total Working Hours based on selected dates
-        total_working_hours = len(selected_dates) * 8
-        agg_data['Total Working Hours'] = total_working_hours
-
-        # Perform necessary transformations
-        agg_data['Total SLA period'] = (
-            agg_data['other_red_flags'] * weights['other_red_flags'] +
-            agg_data['adverse_media'] * weights['adverse_media'] +
-            agg_data['high_risk'] * weights['high_risk'] +
-            agg_data['pep_association'] * weights['pep_association'] +
-            agg_data['country_risk'] * weights['country_risk'] +
-            agg_data['complex_ownership'] * weights['complex_ownership'] +
-            agg_data['young_company'] * weights['young_company'] +
-            agg_data['medium_risk'] * weights['medium_risk'] +
-            (agg_data['document_review'] + agg_data['aml_review'] + agg_data['audit_review'] + agg_data['feedback_review_esc'] + agg_data['feedback_review_meas']) * weights['combined_reviews']
-        )
-
-        # Calculate the "Difference" column
-        agg_data['Difference'] = agg_data['Total Working Hours'] - agg_data['Total SLA period']
+        # Working hours of each reviewer over the selected dates, net of holidays and leave
+        total_working_hours = working_hours(agg_data['EDD_reviewer'].to_numpy(), start_date, end_date, skipped_dates)
 
-        # Close the connection
-        conn.close()
+        # Add the totals, Total SLA period and Difference columns
+        agg_data = build_sla_table(agg_data, total_working_hours)
+        st.write("Data with totals:", agg_data.head())
         return agg_data
 
     except mysql.connector.Error as err:
@@ -202,6 +176,7 @@ def fetch_transformed_data(selected_dates):
         return pd.DataFrame()
 
 def show():
+    db.reset_query_count()
     st.title("Weekly Data Report")
     st.subheader("View and download the required data")
 
@@ -230,10 +205,14 @@ def show():
         )
         selected_month_index = datetime.strptime(selected_month, "%B").month
 
+    use_snapshot = snapshot_toggle(key="weekly_use_snapshot")
+
     # Tabs for weeks
     weeks = ["Week 1", "Week 2", "Week 3", "Week 4"]
     week_tabs = st.tabs(weeks)
 
+    # Date selection of every week first, so the rows of all four weeks can be fetched at once
+    periods = {}
     for week in weeks:
         with week_tabs[weeks.index(week)]:
             st.subheader(f"Data for {week}")
@@ -244,16 +223,28 @@ def show():
 
             # Multiselect for skipping dates
             skipped_dates = st.multiselect(f"Select dates to skip for {week}", pd.date_range(start=start_date, end=end_date).tolist(), key=f"{week}_skipped_dates")
+            periods[week] = (start_date, end_date, skipped_dates)
+
+    # One read covering every week and its WoW / MoM comparison periods; each tab filters its own days out of it
+    rows = fetch_period_rows(
+        kpis.comparison_start(min(start for start, _, _ in periods.values())),
+        max(end for _, end, _ in periods.values()),
+        use_snapshot,
+    )
 
+    for week in weeks:
+        start_date, end_date, skipped_dates = periods[week]
+        with week_tabs[weeks.index(week)]:
             # Calculate working days excluding skipped dates and weekends
-            working_days = [date for date in pd.date_range(start=start_date, end=end_date) if date not in skipped_dates and date.weekday() < 5]
-            total_working_hours = len(working_days) * 8
+            selected_days = working_days(start_date, end_date, skipped_dates)
+            # Before per-reviewer leave and regional holidays, which the table below accounts for
+            total_working_hours = working_hours(None, start_date, end_date, skipped_dates)
 
             st.write(f"Total Working Hours: {total_working_hours}")
-            #st.write("Selected working days:", working_days)
+            #st.write("Selected working days:", selected_days)
 
             # Fetch transformed data based on selected dates
-            filtered_df = fetch_transformed_data(working_days)
+            filtered_df = fetch_transformed_data(start_date, end_date, skipped_dates, use_snapshot=use_snapshot, rows=rows)
 
             st.write("Filtered DataFrame:", filtered_df.head())
 
@@ -262,7 +253,8 @@ def show():
                 col1, col2, col3 = st.columns(3)
 
                 if not filtered_df.empty and filtered_df['Total'].sum() > 0:
-                    total_count = filtered_df['Total'].sum()
+                    # The last row is the Total row
+                    total_count = filtered_df['Total'].iloc[-1]
                     highest_reviewer = filtered_df.iloc[:-1].loc[filtered_df.iloc[:-1]['Total'].idxmax(), 'EDD_reviewer']
                     lowest_reviewer = filtered_df.iloc[:-1].loc[filtered_df.iloc[:-1]['Total'].idxmin(), 'EDD_reviewer']
                 else:
@@ -270,6 +262,9 @@ def show():
                     highest_reviewer = "--"
                     lowest_reviewer = "--"
 
+                # Week-over-week / month-over-month change, from the same rows
+                change, change_color, deltas = kpi_change(filtered_df, start_date, end_date, use_snapshot, rows)
+
                 with col1:
                     st.markdown(f"""
                     <div style="padding: 20px; background-color: #4CAF50; color: white; border-radius: 10px; box-shadow: 0 4px 8px rgba(0,0,0,0.1);">
@@ -277,7 +272,7 @@ def show():
                             <div style="flex-grow: 1;">
                                 <h3 style="margin: 0;">Total Count</h3>
                                 <p style="margin: 5px 0; font-size: 24px; font-weight: bold;">{total_count}</p>
-                                <p style="margin: 0;">Change: <span style="color: {'green' if total_count >= 0 else 'red'};">{total_count}</span></p>
+                                <p style="margin: 0;">Change: <span style="color: {change_color};">{change}</span></p>
                             </div>
                             <div style="font-size: 40px; margin-left: 10px;">&#x1F4C8;</div>  <!-- Bar Chart Icon -->
                         </div>
@@ -310,6 +305,10 @@ def show():
                     </div>
                     """, unsafe_allow_html=True)
 
+                if deltas is not None:
+                    with st.expander("Change by reviewer"):
+                        st.dataframe(deltas)
+
 
             # Display the table using Plotly
             st.write("Transformed Data snapshot:")
@@ -327,31 +326,26 @@ def show():
                 # Download options
                 st.subheader("Download Transformed Data")
                 download_option = st.selectbox("Select format to download", ["CSV", "Excel"], key=f"{week}_download_option")
+                compress = download_option == "CSV" and st.checkbox("Compress CSV (gzip)", key=f"{week}_download_gzip")
 
                 if st.button("Download Transformed Data", key=f"{week}_download_button"):
-                    st.write("Preparing the download...")
-                    progress_bar = st.progress(0)
-
-                    for percent_complete in range(100):
-                        time.sleep(0.01)
-                        progress_bar.progress(percent_complete + 1)
-
                     if download_option == "CSV":
-                        data = filtered_df.to_csv(index=False).encode('utf-8')
+                        progress_bar = st.progress(0.0, text="Preparing the download...")
+                        path = export.write_csv(
+                            export.iter_frame(filtered_df),
+                            compress=compress,
+                            progress=lambda rows_written: progress_bar.progress(rows_written / len(filtered_df), text=f"{rows_written:,} of {len(filtered_df):,} rows written"),
+                        )
                         st.download_button(
                             label="Download as CSV",
-                            data=data,
-                            file_name='transformed_data.csv',
-                            mime='text/csv',
+                            data=export.read_and_remove(path),
+                            **export.csv_download_args(compress, 'transformed_data'),
                         )
                     elif download_option == "Excel":
-                        output = BytesIO()
-                        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                            filtered_df.to_excel(writer, index=False, sheet_name='Sheet1')
-                        processed_data = output.getvalue()
+                        path = export.write_excel(export.iter_frame(filtered_df), sheet_name='Sheet1', fill_colors=styling.fill_colors)
                         st.download_button(
                             label="Download as Excel",
-                            data=processed_data,
+                            data=export.read_and_remove(path),
                             file_name='transformed_data.xlsx',
                             mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
                         )
@@ -381,4 +375,6 @@ def show():
                 ).properties(
                     title="Line Chart"
                 )
-                st.altair_chart(line_chart, use_container_width=True)
\ No newline at end of file
+                st.altair_chart(line_chart, use_container_width=True)
+    # One watermark check and at most one data query per rerun, however many weeks are shown
+    st.caption(f"MySQL queries this rerun: {db.query_count()}")
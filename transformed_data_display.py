@@ -5,107 +5,87 @@ import plotly.express as px
 import plotly.graph_objects as go
 import mysql.connector
 from datetime import datetime
-import time
-from io import BytesIO
-
-# Define weights for each escalation type and EDD measure
-weights = {
-    'other_red_flags': 1,
-    'adverse_media': 3,
-    'high_risk': 5,
-    'pep_association': 3,
-    'country_risk': 1,
-    'complex_ownership': 1,
-    'young_company': 1,
-    'medium_risk': 4,
-    'combined_reviews': 2  # Combined weight for document review, aml review, audit review, and feedback review
-}
-
-def fetch_transformed_data(selected_dates):
+from business_calendar import working_days, working_hours
+import rollup
+import db
+import result_cache
+import export
+import snapshot
+import styling
+import kpis
+from aggregation import aggregate_by_reviewer, build_sla_table
+
+def fetch_transformed_data(start_date, end_date, skipped_dates=(), group_in_sql=False, use_snapshot=False):
     try:
-        # Establish database connection
-        conn = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root',
-            database='TERRAPAY'
-        )
+        # Results are reused until the onboarding watermark moves
+        period = (start_date, end_date, tuple(sorted(skipped_dates)))
+        group_in_sql = group_in_sql and not use_snapshot
+
+        if use_snapshot:
+            # Raw rows of the selected working days from the Parquet snapshot, without querying MySQL
+            df = snapshot.load_period(start_date, end_date, skipped_dates)
+        else:
+            with db.connection() as conn:
+                if group_in_sql:
+                    # The whole reviewer breakdown runs as one GROUP BY in MySQL
+                    agg_data = result_cache.cached(conn, ('reviewer_breakdown',) + period, lambda: rollup.fetch_reviewer_breakdown(conn, start_date, end_date, skipped_dates))
+                else:
+                    # Fetch the daily rollup rows of the selected working days; the date filter runs in MySQL
+                    df = result_cache.cached(conn, ('daily_counts',) + period, lambda: rollup.fetch_daily_counts(conn, start_date, end_date, skipped_dates))
+
+        if not group_in_sql:
+            st.write("Fetched data from database:", df.head(2))
+
+            filtered_data = st.toggle("Data after date filter:")
+            if filtered_data:
+                st.dataframe(df)
+
+            # Aggregating the counts of escalation types and EDD measures per reviewer
+            agg_data = aggregate_by_reviewer(df, count_column=None if use_snapshot else 'entry_count')
 
-        # Fetch data
-        query = "SELECT * FROM onboarding"
-        df = pd.read_sql(query, conn)
-        st.write("Fetched data from database:", df.head(2))
-        
-        # Convert completion_date to datetime
-        df['completion_date'] = pd.to_datetime(df['completion_date'])
-
-        # Filter data based on selected dates
-        df = df[df['completion_date'].isin(selected_dates)]
-        
-        filtered_data = st.toggle("Data after date filter:")
-        if filtered_data:
-            st.dataframe(df)
-
-        if df.empty:
+        if agg_data.empty:
             st.warning("No data available for the selected dates.")
             return pd.DataFrame()
 
-        # Aggregating the counts of escalation types and EDD measures per reviewer
-        agg_data = df.groupby('EDD_reviewer').agg(
-            other_red_flags=('escalation_type', lambda x: (x == 'other_red_flags').sum()),
-            adverse_media=('escalation_type', lambda x: (x == 'adverse_media').sum()),
-            high_risk=('escalation_type', lambda x: (x == 'high_risk').sum()),
-            pep_association=('escalation_type', lambda x: (x == 'pep_association').sum()),
-            country_risk=('escalation_type', lambda x: (x == 'country_risk').sum()),
-            complex_ownership=('escalation_type', lambda x: (x == 'complex_ownership').sum()),
-            young_company=('escalation_type', lambda x: (x == 'young_company').sum()),
-            medium_risk=('escalation_type', lambda x: (x == 'medium_risk').sum()),
-            feedback_review_esc=('escalation_type', lambda x: (x == 'feedback_review').sum()),
-            document_review=('EDD_measures', lambda x: (x == 'document_review').sum()),
-            aml_review=('EDD_measures', lambda x: (x == 'aml_review').sum()),
-            audit_review=('EDD_measures', lambda x: (x == 'audit_review').sum()),
-            feedback_review_meas=('EDD_measures', lambda x: (x == 'feedback_review').sum())
-        ).reset_index()
-
         aggregated_data = st.toggle("Data after aggregation:")
         if aggregated_data:
             st.dataframe(agg_data)
 
-        # Calculate totals for each row and column
-        agg_data['Total'] = agg_data.iloc[:, 1:].sum(axis=1)
-        total_row = pd.DataFrame(agg_data.sum(numeric_only=True)).transpose()
-        total_row['EDD_reviewer'] = 'Total'
-        agg_data = pd.concat([agg_data, total_row], ignore_index=True)
-        st.write("Data with totals:", agg_data)
-
-        # Calculate Total Working Hours based on selected dates
-        total_working_hours = len(selected_dates) * 8
-        agg_data['Total Working Hours'] = total_working_hours
-
-        # Perform necessary transformations
-        agg_data['Total SLA period'] = (
-            agg_data['other_red_flags'] * weights['other_red_flags'] +
-            agg_data['adverse_media'] * weights['adverse_media'] +
-            agg_data['high_risk'] * weights['high_risk'] +
-            agg_data['pep_association'] * weights['pep_association'] +
-            agg_data['country_risk'] * weights['country_risk'] +
-            agg_data['complex_ownership'] * weights['complex_ownership'] +
-            agg_data['young_company'] * weights['young_company'] +
-            agg_data['medium_risk'] * weights['medium_risk'] +
-            (agg_data['document_review'] + agg_data['aml_review'] + agg_data['audit_review'] + agg_data['feedback_review_esc'] + agg_data['feedback_review_meas']) * weights['combined_reviews']
-        )
-
-        # Calculate the "Difference" column
-        agg_data['Difference'] = agg_data['Total Working Hours'] - agg_data['Total SLA period']
+        # Working hours of each reviewer over the selected dates, net of holidays and leave
+        total_working_hours = working_hours(agg_data['EDD_reviewer'].to_numpy(), start_date, end_date, skipped_dates)
 
-        # Close the connection
-        conn.close()
+        # Add the totals, Total SLA period and Difference columns
+        agg_data = build_sla_table(agg_data, total_working_hours)
+        st.write("Data with totals:", agg_data)
         return agg_data
 
     except mysql.connector.Error as err:
         st.error(f"Error fetching data: {err}")
         return pd.DataFrame()
 
+def snapshot_toggle(key=None):
+    """"Read from snapshot" toggle, only offered once a snapshot exists."""
+    if not snapshot.available():
+        return False
+    use_snapshot = st.toggle("Read from snapshot", key=key)
+    if use_snapshot:
+        snapshot_info = snapshot.info()
+        st.caption(f"Snapshot of {snapshot_info['rows']:,} rows taken at {snapshot_info['taken_at']}")
+    return use_snapshot
+
+def kpi_change(filtered_df, start_date, end_date, use_snapshot=False, rows=None):
+    """Text and color of the Total Count card's change line, and the per-reviewer deltas.
+
+    rows, when given, cover the comparison periods (see kpis.comparison_start)."""
+    if filtered_df.empty:
+        return "--", "gray", None
+    try:
+        deltas = kpis.period_deltas(filtered_df, start_date, end_date, use_snapshot, rows)
+    except mysql.connector.Error as err:
+        st.warning(f"Could not load the previous periods: {err}")
+        return "--", "gray", None
+    return kpis.change_summary(deltas), 'green' if deltas.at['Total', 'WoW Change'] >= 0 else 'red', deltas
+
 def show():
     st.info("Weekly Data Report")
     st.subheader("View and download the required data")
@@ -170,16 +150,40 @@ def show():
         skipped_dates = st.multiselect("Select dates to skip", pd.date_range(start=start_date, end=end_date).tolist())
 
         # Calculate working days excluding skipped dates and weekends
-        working_days = [date for date in pd.date_range(start=start_date, end=end_date) if date not in skipped_dates and date.weekday() < 5]
-        total_working_hours = len(working_days) * 8
+        selected_days = working_days(start_date, end_date, skipped_dates)
+        # Before per-reviewer leave and regional holidays, which the table below accounts for
+        total_working_hours = working_hours(None, start_date, end_date, skipped_dates)
 
         st.write(f"Total Working Hours: {total_working_hours}")
-        st.write("Selected working days:", working_days)
+        st.write("Selected working days:", selected_days)
+
+        # Read from the Parquet snapshot when one has been taken, or optionally let MySQL compute the breakdown
+        use_snapshot = snapshot_toggle()
+        group_in_sql = not use_snapshot and st.toggle("Aggregate in MySQL")
 
         # Fetch transformed data based on selected dates
-        filtered_df = fetch_transformed_data(working_days)
+        filtered_df = fetch_transformed_data(start_date, end_date, skipped_dates, group_in_sql, use_snapshot)
+
+        # Parity check of the MySQL breakdown against the pandas path
+        if group_in_sql and st.toggle("Check MySQL breakdown against pandas"):
+            try:
+                with db.connection() as conn:
+                    mismatches = rollup.compare_breakdowns(conn, start_date, end_date, skipped_dates)
+                if mismatches.empty:
+                    st.success("MySQL and pandas breakdowns match.")
+                else:
+                    st.error("MySQL and pandas breakdowns differ:")
+                    st.dataframe(mismatches)
+            except mysql.connector.Error as err:
+                st.error(f"Error checking breakdown: {err}")
 
         st.write("Filtered DataFrame:", filtered_df.head())
+        cache_stats = result_cache.stats()
+        pool_stats = db.pool_stats()
+        st.caption(
+            f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses | "
+            f"Pool wait: avg {pool_stats['wait_avg'] * 1000:.1f} ms, max {pool_stats['wait_max'] * 1000:.1f} ms"
+        )
 
         # Custom CSS for KPI cards
         custom_css = """
@@ -237,7 +241,8 @@ def show():
             col1, col2, col3 = st.columns(3)
 
             if not filtered_df.empty and filtered_df['Total'].sum() > 0:
-                total_count = filtered_df['Total'].sum()
+                # The last row is the Total row
+                total_count = filtered_df['Total'].iloc[-1]
                 highest_reviewer = filtered_df.iloc[:-1].loc[filtered_df.iloc[:-1]['Total'].idxmax(), 'EDD_reviewer']
                 lowest_reviewer = filtered_df.iloc[:-1].loc[filtered_df.iloc[:-1]['Total'].idxmin(), 'EDD_reviewer']
             else:
@@ -245,12 +250,15 @@ def show():
                 highest_reviewer = "--"
                 lowest_reviewer = "--"
 
+            # Week-over-week / month-over-month change; previous periods are memoized
+            change, change_color, deltas = kpi_change(filtered_df, start_date, end_date, use_snapshot)
+
         with col1:
             st.markdown(f"""
             <div class="kpi-card" style="background-color: #AEDFF7; color: #333; box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1); padding: 20px; border-radius: 10px; width: 100%; height: 150px;">
                 <h3><span class="kpi-icon">🔥</span> Total Count</h3>  <!-- Fire Icon -->
                 <h2>{total_count}</h2>
-                <small>Change: <span style="color: {'green' if total_count >= 0 else 'red'};">{total_count}</span></small>
+                <small>Change: <span style="color: {change_color};">{change}</span></small>
                 <div class="tooltip">Total tasks completed in the selected period</div>
             </div>
             """, unsafe_allow_html=True)
@@ -273,36 +281,22 @@ def show():
             </div>
             """, unsafe_allow_html=True)
 
+        if deltas is not None:
+            with st.expander("Change by reviewer"):
+                st.dataframe(deltas)
+
 
 
         # Display the table using Plotly with enhanced features
         st.write("Transformed Data preview:")
         if not filtered_df.empty:
-            # Adding a "Total" row
-            total_row = filtered_df.sum(numeric_only=True).to_frame().T
-            total_row['EDD_reviewer'] = 'Total'
-            filtered_df = pd.concat([filtered_df, total_row], ignore_index=True)
-
-            # Create a color array for cells
-            cell_colors = []
-            for row in filtered_df.itertuples():
-                row_colors = []
-                for col, val in zip(filtered_df.columns, row):
-                    if col == 'EDD_reviewer' or col == 'Total':
-                        row_colors.append('#FFD700' if val == 'Total' else '#FFFFE0')  # Light gold for 'Total' and light yellow for others
-                    elif col == 'Total Working Hours' or col == 'Total SLA period' or col == 'Difference':
-                        row_colors.append('#E6E6FA')  # Lavender for 'Total Working Hours', 'Total SLA period', 'Difference'
-                    else:
-                        row_colors.append('#FFFFFF')  # White for others
-                cell_colors.append(row_colors)
-            
-            # Transpose the color array for correct placement
-            cell_colors = list(map(list, zip(*cell_colors)))
-            
+            # The Total row already comes from fetch_transformed_data; colors are per column class
+            cell_colors = styling.fill_colors(filtered_df).tolist()
+
             fig = go.Figure(data=[go.Table(
                 header=dict(
                     values=list(filtered_df.columns),
-                    fill_color='#4CAF50',
+                    fill_color=styling.HEADER_COLOR,
                     align='center',
                     font=dict(color='white', size=12),
                     line_color='darkslategray',
@@ -330,31 +324,26 @@ def show():
             # Download options
             st.subheader("Download Transformed Data")
             download_option = st.selectbox("Select format to download", ["CSV", "Excel"], key="download_option")
+            compress = download_option == "CSV" and st.checkbox("Compress CSV (gzip)", key="download_gzip")
 
             if st.button("Download Transformed Data", key="download_button"):
-                st.write("Preparing the download...")
-                progress_bar = st.progress(0)
-
-                for percent_complete in range(100):
-                    time.sleep(0.01)
-                    progress_bar.progress(percent_complete + 1)
-
                 if download_option == "CSV":
-                    data = filtered_df.to_csv(index=False).encode('utf-8')
+                    progress_bar = st.progress(0.0, text="Preparing the download...")
+                    path = export.write_csv(
+                        export.iter_frame(filtered_df),
+                        compress=compress,
+                        progress=lambda rows_written: progress_bar.progress(rows_written / len(filtered_df), text=f"{rows_written:,} of {len(filtered_df):,} rows written"),
+                    )
                     st.download_button(
                         label="Download as CSV",
-                        data=data,
-                        file_name='transformed_data.csv',
-                        mime='text/csv',
+                        data=export.read_and_remove(path),
+                        **export.csv_download_args(compress, 'transformed_data'),
                     )
                 elif download_option == "Excel":
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                        filtered_df.to_excel(writer, index=False, sheet_name='Sheet1')
-                    processed_data = output.getvalue()
+                    path = export.write_excel(export.iter_frame(filtered_df), sheet_name='Sheet1', fill_colors=styling.fill_colors)
                     st.download_button(
                         label="Download as Excel",
-                        data=processed_data,
+                        data=export.read_and_remove(path),
                         file_name='transformed_data.xlsx',
                         mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
                     )
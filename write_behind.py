@@ -0,0 +1,215 @@
+"""Optional write-behind mode for Input Form submissions.
+
+With WRITE_BEHIND=1 a submission is appended (and fsynced) to a local journal file and
+acknowledged right away. A background thread flushes the journal to MySQL in batched multi-row
+inserts and only then advances the committed offset. The entry's UUID id makes a replayed batch
+harmless: rows that are already there are skipped and the rollup is recounted, not incremented.
+
+Entries that can never be written don't hold up the ones behind them. A line that can't be
+parsed, and (once a batch has failed WRITE_BEHIND_MAX_ATTEMPTS times in a row) a record MySQL
+rejects on its own, are appended to write_behind.dead.jsonl with the error, and the offset moves
+past them. Lost connections are retried with backoff as long as it takes.
+
+    WRITE_BEHIND                1 to enable (default off)
+    WRITE_BEHIND_DIR            directory of the journal (default ./data)
+    WRITE_BEHIND_BATCH          max entries per INSERT (default 500)
+    WRITE_BEHIND_INTERVAL       seconds between flushes when idle (default 1)
+    WRITE_BEHIND_MAX_ATTEMPTS   failed flushes of a batch before its records are tried one by one (default 5)
+"""
+import json
+import logging
+import os
+import threading
+from datetime import date
+import mysql.connector
+import db
+import rollup
+from bulk_import import BULK_INSERT_QUERY, COLUMNS
+
+ENABLED = os.getenv("WRITE_BEHIND", "0") == "1"
+QUEUE_DIR = os.getenv("WRITE_BEHIND_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH", 500))
+FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", 1))
+MAX_ATTEMPTS = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", 5))
+MAX_BACKOFF = 30
+
+JOURNAL_PATH = os.path.join(QUEUE_DIR, "write_behind.jsonl")
+OFFSET_PATH = os.path.join(QUEUE_DIR, "write_behind.offset")
+DEAD_LETTER_PATH = os.path.join(QUEUE_DIR, "write_behind.dead.jsonl")
+
+# Errors that say nothing about the record itself
+TRANSIENT_ERRORS = (mysql.connector.errors.InterfaceError, mysql.connector.errors.OperationalError, mysql.connector.errors.PoolError)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_worker = None
+# Journal offset -> failed flushes in a row of the batch starting there
+_failures = {}
+
+
+def _read_offset():
+    try:
+        with open(OFFSET_PATH) as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _write_offset(offset):
+    # Write-then-rename so a crash never leaves a half-written offset
+    tmp_path = OFFSET_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, OFFSET_PATH)
+
+
+def enqueue(entry_id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp):
+    """Durably queue one submission; returns as soon as it is on disk."""
+    record = dict(zip(COLUMNS, (entry_id, completion_date, partner_name, deal_type, review_type, escalation_type, EDD_reviewer, EDD_measures, timestamp)))
+    line = json.dumps(record, default=str) + "\n"
+    with _lock:
+        os.makedirs(QUEUE_DIR, exist_ok=True)
+        with open(JOURNAL_PATH, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+    start_worker()
+    _wakeup.set()
+
+
+def _parse(line):
+    record = json.loads(line)
+    if record['completion_date']:
+        record['completion_date'] = date.fromisoformat(record['completion_date'])
+    return tuple(record[col] for col in COLUMNS)
+
+
+def _read_batch(offset):
+    """Up to BATCH_SIZE complete journal lines after offset, and the offset just past them.
+
+    Each line comes as (line, row, error); row is None and error set when it can't be parsed.
+    """
+    entries = []
+    try:
+        with open(JOURNAL_PATH, "rb") as f:
+            f.seek(offset)
+            while len(entries) < BATCH_SIZE:
+                line = f.readline()
+                # A line without its newline is an append still in progress (or torn by a crash)
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                try:
+                    entries.append((line, _parse(line), None))
+                except (ValueError, KeyError, TypeError) as err:
+                    entries.append((line, None, f"unreadable journal line: {err!r}"))
+    except FileNotFoundError:
+        pass
+    return entries, offset
+
+
+def _dead_letter(rejected):
+    """Append (line, error) pairs to the dead-letter file."""
+    if not rejected:
+        return
+    with _lock:
+        with open(DEAD_LETTER_PATH, "a", encoding="utf-8") as f:
+            for line, error in rejected:
+                f.write(json.dumps({'error': error, 'line': line.decode("utf-8", "replace").rstrip("\n")}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    logger.error("Write-behind moved %d journal entries to %s", len(rejected), DEAD_LETTER_PATH)
+
+
+def _insert(rows):
+    with db.transaction() as conn:
+        c = conn.cursor()
+        c.executemany(BULK_INSERT_QUERY, rows)
+        rollup.refresh_dates(c, [row[1] for row in rows if row[1] is not None])
+        c.close()
+
+
+def _insert_each(entries):
+    """Insert (line, row) entries one at a time; returns (line, error) of those MySQL rejects."""
+    rejected = []
+    for line, row in entries:
+        try:
+            _insert([row])
+        except TRANSIENT_ERRORS:
+            # Not the record's fault; the whole batch is retried later and the ids skip what got in
+            raise
+        except mysql.connector.Error as err:
+            rejected.append((line, str(err)))
+    return rejected
+
+
+def _compact(offset):
+    # Once everything is flushed, start a fresh journal so it doesn't grow forever
+    with _lock:
+        if os.path.exists(JOURNAL_PATH) and os.path.getsize(JOURNAL_PATH) == offset:
+            # Reset the offset first: a crash in between only replays flushed entries
+            _write_offset(0)
+            os.remove(JOURNAL_PATH)
+
+
+def flush_once():
+    """Flush one batch; returns the number of journal entries it consumed."""
+    offset = _read_offset()
+    entries, next_offset = _read_batch(offset)
+    if not entries:
+        return 0
+    rows = [(line, row) for line, row, error in entries if error is None]
+    rejected = [(line, error) for line, row, error in entries if error is not None]
+    try:
+        if rows:
+            _insert([row for _, row in rows])
+    except mysql.connector.Error as err:
+        attempts = _failures.get(offset, 0) + 1
+        _failures.clear()
+        _failures[offset] = attempts
+        if attempts < MAX_ATTEMPTS or isinstance(err, TRANSIENT_ERRORS):
+            raise
+        # The batch keeps failing: write its records one by one and set aside those MySQL rejects
+        rejected += _insert_each(rows)
+    _failures.pop(offset, None)
+    _dead_letter(rejected)
+    # Only advance after the commit; a crash in between replays the batch, which the id makes safe
+    _write_offset(next_offset)
+    _compact(next_offset)
+    return len(entries)
+
+
+def _run():
+    backoff = FLUSH_INTERVAL
+    while True:
+        _wakeup.wait(timeout=backoff)
+        _wakeup.clear()
+        try:
+            while flush_once() == BATCH_SIZE:
+                pass
+            backoff = FLUSH_INTERVAL
+        except Exception:
+            logger.exception("Write-behind flush failed; retrying in %.0fs", backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+
+def start_worker():
+    global _worker
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="write-behind", daemon=True)
+            _worker.start()
+
+
+def pending():
+    """Number of queued entries not yet flushed to MySQL."""
+    try:
+        with open(JOURNAL_PATH, "rb") as f:
+            f.seek(_read_offset())
+            return f.read().count(b"\n")
+    except FileNotFoundError:
+        return 0